@@ -19,6 +19,29 @@ class BilibiliAPI(API):
     BVID_PATTERN = r'(?P<bvid>av\d+|(?:BV|bv)[A-Za-z0-9]{10})'
     _NAME = 'B站'
 
+    # URL patterns compiled once at import; alternatives are ordered with the
+    # more common modern forms first
+    _VIDEO_URL_RE = re.compile(rf'^(?:https?://)?www\.bilibili\.com/video/{BVID_PATTERN}')
+    _COLLECTION_URL_RES = [re.compile(pattern) for pattern in (
+        r'^(?:https?://)?space\.bilibili\.com/(?P<uid>\d+)/lists/(?P<list_id>\d+)\?(?:.*&)?type=season\b',
+        r'^(?:https?://)?space\.bilibili\.com/(?P<uid>\d+)/channel/collectiondetail\?(?:.*&)?sid=(?P<list_id>\d+)',
+    )]
+    _SERIES_URL_RES = [re.compile(pattern) for pattern in (
+        r'^(?:https?://)?space\.bilibili\.com/(?P<uid>\d+)/lists/(?P<list_id>\d+)\?(?:.*&)?type=series\b',
+        r'^(?:https?://)?space\.bilibili\.com/(?P<uid>\d+)/channel/seriesdetail\?(?:.*&)?sid=(?P<list_id>\d+)',
+        r'^(?:https?://)?www\.bilibili\.com/medialist/play/(?P<uid>\d+)\?(?:.*&)?business_id=(?P<list_id>\d+)',
+        r'^(?:https?://)?www\.bilibili\.com/list/(?P<uid>\d+)\?(?:.*&)?sid=(?P<list_id>\d+)',
+    )]
+    _FAVORITE_URL_RES = [re.compile(pattern) for pattern in (
+        r'^(?:https?://)?space\.bilibili\.com/(?P<uid>\d+)/favlist\?(?:.*&)?fid=(?P<list_id>\d+)',
+        r'^(?:https?://)?www\.bilibili\.com/list/ml(?P<list_id>\d+)',
+        r'^(?:https?://)?www\.bilibili\.com/medialist/play/ml(?P<list_id>\d+)',
+    )]
+    _PART_SONG_ID_RE = re.compile(r'(?P<bvid>[^_]*)_p(?P<part>\d+)')
+    _SONG_ID_RE = re.compile(rf'{BVID_PATTERN}(?:_p\d+)?')
+    _VIDEO_QUERY_RE = re.compile(rf'www\.bilibili\.com/video/{BVID_PATTERN}')
+    _PART_QUERY_RE = re.compile(r'(?:^|&)p=(?P<part>\d+)')
+
     @staticmethod
     def _clean_html(s: str):
         return re.sub(r'<[^>]*?>', '', s)
@@ -152,7 +175,7 @@ class BilibiliAPI(API):
             logger.debug(f'Retry getting songinfo using proxy for {song_id}')
 
         song_id = song_id.id if isinstance(song_id, SearchResult) else song_id
-        if match := re.match(r'(?P<bvid>[^_]*)_p(?P<part>\d+)', song_id):
+        if match := self._PART_SONG_ID_RE.match(song_id):
             bvid, part = match.group('bvid'), match.group('part')
             return await self._get_part_info(bvid, int(part), proxy)
         else:
@@ -348,31 +371,19 @@ class BilibiliAPI(API):
             logger.warning(f'Expected series or favorite playlist, got playlist with url: {playlist.url}')
 
     def _parse_playlist_url(self, url: str) -> ParsedPlaylistUrl | None:
-        if match := re.search(rf'^(?:https?://)?www\.bilibili\.com/video/{self.BVID_PATTERN}', url):
+        if match := self._VIDEO_URL_RE.search(url):
             return ParsedPlaylistUrl('multipart', match.group('bvid'), {})
 
-        for pattern in [
-            r'^(?:https?://)?space\.bilibili\.com/(?P<uid>\d+)/channel/collectiondetail\?(?:.*&)?sid=(?P<list_id>\d+)',
-            r'^(?:https?://)?space\.bilibili\.com/(?P<uid>\d+)/lists/(?P<list_id>\d+)\?(?:.*&)?type=season\b',
-        ]:
-            if match := re.search(pattern, url):
+        for pattern in self._COLLECTION_URL_RES:
+            if match := pattern.search(url):
                 return ParsedPlaylistUrl('collection', match.group('list_id'), {'uid': match.group('uid')})
 
-        for pattern in [
-            r'^(?:https?://)?space\.bilibili\.com/(?P<uid>\d+)/channel/seriesdetail\?(?:.*&)?sid=(?P<list_id>\d+)',
-            r'^(?:https?://)?www\.bilibili\.com/medialist/play/(?P<uid>\d+)\?(?:.*&)?business_id=(?P<list_id>\d+)',
-            r'^(?:https?://)?www\.bilibili\.com/list/(?P<uid>\d+)\?(?:.*&)?sid=(?P<list_id>\d+)',
-            r'^(?:https?://)?space\.bilibili\.com/(?P<uid>\d+)/lists/(?P<list_id>\d+)\?(?:.*&)?type=series\b',
-        ]:
-            if match := re.search(pattern, url):
+        for pattern in self._SERIES_URL_RES:
+            if match := pattern.search(url):
                 return ParsedPlaylistUrl('series', match.group('list_id'), {'uid': match.group('uid')})
 
-        for pattern in [
-            r'^(?:https?://)?space\.bilibili\.com/(?P<uid>\d+)/favlist\?(?:.*&)?fid=(?P<list_id>\d+)',
-            r'^(?:https?://)?www\.bilibili\.com/medialist/play/ml(?P<list_id>\d+)',
-            r'^(?:https?://)?www\.bilibili\.com/list/ml(?P<list_id>\d+)',
-        ]:
-            if match := re.search(pattern, url):
+        for pattern in self._FAVORITE_URL_RES:
+            if match := pattern.search(url):
                 return ParsedPlaylistUrl('favorite', match.group('list_id'), {})
 
     def _to_playlist_url(self, parsed: ParsedPlaylistUrl | PlaylistResult) -> str:
@@ -406,10 +417,10 @@ class BilibiliAPI(API):
 
     def match_song_id(self, query: str) -> str | None:
         query = query.strip()
-        if re.match(rf'{self.BVID_PATTERN}(?:_p\d+)?', query):
+        if self._SONG_ID_RE.match(query):
             return query
-        if match := re.search(rf'www\.bilibili\.com/video/{self.BVID_PATTERN}', query):
-            if part := re.search(r'(?:^|&)p=(?P<part>\d+)', query.split('?')[-1]):
+        if match := self._VIDEO_QUERY_RE.search(query):
+            if part := self._PART_QUERY_RE.search(query.split('?')[-1]):
                 return f'{match.group("bvid")}_p{part.group("part")}'
             return match.group('bvid')
         return None
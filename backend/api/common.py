@@ -24,6 +24,10 @@ class SearchResult:
     singer: str
     meta: dict = dataclasses.field(default_factory=dict)
 
+    def to_dict(self) -> dict:
+        # flat dict build, avoiding dataclasses.asdict's recursive deep copy
+        return {'id': self.id, 'title': self.title, 'singer': self.singer, 'meta': self.meta}
+
 
 @dataclasses.dataclass
 class UserPlaylistResult:
@@ -31,6 +35,10 @@ class UserPlaylistResult:
     title: str
     count: int | None
 
+    def to_dict(self) -> dict:
+        # flat dict build, avoiding dataclasses.asdict's recursive deep copy
+        return {'url': self.url, 'title': self.title, 'count': self.count}
+
 
 @dataclasses.dataclass
 class ParsedPlaylistUrl:
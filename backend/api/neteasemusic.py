@@ -20,6 +20,13 @@ logger = logging.getLogger('api.neteasemusic')
 class NeteaseMusicAPI(API):
     _NAME = '网易云'
 
+    # URL patterns compiled once at import
+    _PLAYLIST_URL_RE = re.compile(
+        r'^(?:https?://)?(?:y\.)?music\.163\.com/(?:#/(?:my/m/music/)?|m/)?(?P<type>playlist|discover/toplist)/?\?(?:.*&)?id=(?P<id>[0-9]+)')
+    _SONG_ID_RE = re.compile(r'[1-9]\d{5,}')
+    _SONG_KEYWORD_RE = re.compile(r'网易云(?:音乐)?\s*(?P<id>[1-9]\d+)')
+    _SONG_URL_RE = re.compile(r'music\.163\.com/(?:#/)?song/?\?(?:.*&)?id=(?P<id>[1-9]\d+)')
+
     async def _request_eapi(self, path: str, body: dict):
         body['header'] = {
             'osver': 'undefined',
@@ -158,9 +165,7 @@ class NeteaseMusicAPI(API):
         )
 
     def _parse_playlist_url(self, url: str) -> ParsedPlaylistUrl | None:
-        if match := re.search(
-            r'^(?:https?://)?(?:y\.)?music\.163\.com/(?:#/(?:my/m/music/)?|m/)?(?P<type>playlist|discover/toplist)/?\?(?:.*&)?id=(?P<id>[0-9]+)', url
-        ):
+        if match := self._PLAYLIST_URL_RE.search(url):
             return ParsedPlaylistUrl('playlist', match.group('id'), {'type': match.group('type')})
         return None
 
@@ -203,10 +208,10 @@ class NeteaseMusicAPI(API):
 
     def match_song_id(self, query: str) -> str | None:
         query = query.strip()
-        if re.match(r'[1-9]\d{5,}', query):
+        if self._SONG_ID_RE.match(query):
             return query
-        if match := re.search(r'网易云(?:音乐)?\s*(?P<id>[1-9]\d+)', query):
+        if match := self._SONG_KEYWORD_RE.search(query):
             return match.group('id')
-        if match := re.search(r'music\.163\.com/(?:#/)?song/?\?(?:.*&)?id=(?P<id>[1-9]\d+)', query):
+        if match := self._SONG_URL_RE.search(query):
             return match.group('id')
         return None
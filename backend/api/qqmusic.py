@@ -16,6 +16,15 @@ logger = logging.getLogger('api.qqmusic')
 class QQMusicAPI(API):
     _NAME = 'QQ音乐'
 
+    # URL patterns compiled once at import; the ryqq form is the common one
+    _SONG_ID_PATTERN = r'(?P<id>\d{3}[A-Za-z0-9]{11})'
+    _SONG_ID_RE = re.compile(_SONG_ID_PATTERN)
+    _SONG_URL_RE = re.compile(rf'y\.qq\.com/n/ryqq/songDetail/{_SONG_ID_PATTERN}')
+    _PLAYLIST_URL_RES = [re.compile(pattern) for pattern in (
+        r'^(?:https?://)?y\.qq\.com/n/ryqq/playlist/(?P<id>[0-9]+)',
+        r'^(?:https?://)?i\.y\.qq\.com/n2/m/share/details/taoge\.html\?(?:.*&)?id=(?P<id>[0-9]+)',
+    )]
+
     _FORMATS = {
         'M800': {'name': '320mp3', 'ext': 'mp3', 'preference': 4},
         'M500': {'name': '128mp3', 'ext': 'mp3', 'preference': 3},
@@ -263,12 +272,9 @@ class QQMusicAPI(API):
         )
 
     def _parse_playlist_url(self, url: str) -> ParsedPlaylistUrl | None:
-        if match := re.search(
-            r'^(?:https?://)?y\.qq\.com/n/ryqq/playlist/(?P<id>[0-9]+)', url
-        ) or re.search(
-            r'^(?:https?://)?i\.y\.qq\.com/n2/m/share/details/taoge\.html\?(?:.*&)?id=(?P<id>[0-9]+)', url
-        ):
-            return ParsedPlaylistUrl('playlist', match.group('id'), {})
+        for pattern in self._PLAYLIST_URL_RES:
+            if match := pattern.search(url):
+                return ParsedPlaylistUrl('playlist', match.group('id'), {})
 
     def _to_playlist_url(self, parsed: ParsedPlaylistUrl | PlaylistResult) -> str:
         if parsed.type == 'playlist':
@@ -317,9 +323,8 @@ class QQMusicAPI(API):
 
     def match_song_id(self, query: str) -> str | None:
         query = query.strip()
-        id_pattern = r'(?P<id>\d{3}[A-Za-z0-9]{11})'
-        if re.match(id_pattern, query):
+        if self._SONG_ID_RE.match(query):
             return query
-        if match := re.search(rf'y\.qq\.com/n/ryqq/songDetail/{id_pattern}', query):
+        if match := self._SONG_URL_RE.search(query):
             return match.group('id')
         return None
@@ -10,7 +10,14 @@ import ssl
 import contextlib
 
 import aiohttp
+import aiohttp.web
 import certifi
+import orjson
+
+try:
+    from asyncio import timeout as async_timeout  # noqa: F401  # Python 3.11+
+except ImportError:  # Python 3.10, pulled in by aiohttp
+    from async_timeout import timeout as async_timeout  # type: ignore[assignment, no-redef]  # noqa: F401
 
 logger = logging.getLogger('config')
 
@@ -41,6 +48,16 @@ async def aiohttp_session(**kwargs):
         yield session
 
 
+def json_response(data, status: int = 200) -> aiohttp.web.Response:
+    """Like aiohttp.web.json_response but encoded with orjson
+
+    default=str and OPT_NON_STR_KEYS keep stdlib json's tolerance for
+    datetime values and int dict keys.
+    """
+    return aiohttp.web.Response(body=orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS),
+                                status=status, content_type='application/json')
+
+
 def parse_types(cls: type, allowed_types: list[type] = [int, float, str, bool, tuple, type(None)]):
     field_types: dict[str, type | tuple[type, ...]] = {}
     for k, v in typing.get_type_hints(cls, globalns=globals(), localns=locals()).items():
@@ -71,6 +88,8 @@ class DataConfig():
         self._sub_configs: dict[str, DataConfig] = {}
         self._fields: dict[str, type | tuple[type, ...]] = self.get_fields()
         self._suppress_save = False
+        self._defer_save = False
+        self._save_pending = False
         logger.debug(f'init {self.__class__.__name__} with fields: {self._fields}')
 
     def validate(self, key: str, value: typing.Any):
@@ -89,9 +108,16 @@ class DataConfig():
         self._sub_configs.pop(prefix)
         self.save_config()
 
+    # resolved field types per subclass; typing.get_type_hints is expensive
+    # and the result only depends on the class, not the instance
+    # (deliberately unannotated so it stays invisible to get_type_hints)
+    _parsed_fields_cache = {}
+
     @classmethod
     def get_fields(cls):
-        return parse_types(cls)
+        if cls not in DataConfig._parsed_fields_cache:
+            DataConfig._parsed_fields_cache[cls] = parse_types(cls)
+        return DataConfig._parsed_fields_cache[cls]
 
     @classmethod
     def _assert_dataclass(cls):
@@ -157,12 +183,34 @@ class DataConfig():
         finally:
             self._suppress_save = False
 
+    @contextlib.contextmanager
+    def batch_save(self):
+        '''coalesce the save-per-assignment writes of multiple field updates into one;
+        reentrant, so nested batches piggyback on the outermost one'''
+        root = self
+        while root._parent:
+            root = root._parent
+        if root._defer_save:
+            yield
+            return
+        root._defer_save = True
+        root._save_pending = False
+        try:
+            yield
+        finally:
+            root._defer_save = False
+            if root._save_pending:
+                root._save_pending = False
+                root.save_config()
+
     def save_config(self):
         if self._suppress_save:
             logger.warning('save is suppressed, not writing should have been performed', stack_info=True)
             return
         if self._parent:
             self._parent.save_config()
+        elif self._defer_save:
+            self._save_pending = True
         else:
             assert self._config_fn, 'root config must have a config file'
             with open(f'{self._config_fn}.tmp', 'wt', encoding='utf-8') as f:
@@ -194,14 +242,15 @@ class DataConfig():
     def update(self, data):
         if not isinstance(data, dict):
             raise ValueError(f'[{self.path}] update data must be a dict, got {type(data)}: {data}')
-        for key, value in data.items():
-            if key in self._fields:
-                logger.debug(f'[{self.path}] update {key} = {value}')
-                setattr(self, key, value)
-            elif key in self._sub_configs:
-                self._sub_configs[key].update(value)
-            else:
-                logger.warning(f'[{self.path}] update data contains invalid key: {key}')
+        with self.batch_save():
+            for key, value in data.items():
+                if key in self._fields:
+                    logger.debug(f'[{self.path}] update {key} = {value}')
+                    setattr(self, key, value)
+                elif key in self._sub_configs:
+                    self._sub_configs[key].update(value)
+                else:
+                    logger.warning(f'[{self.path}] update data contains invalid key: {key}')
 
     def __setattr__(self, name, value):
         if name not in getattr(self, '_fields', {}):
@@ -35,7 +35,7 @@ async def get_debug_ws_url(debug_port: int):
             return data[0]['webSocketDebuggerUrl'].strip()
 
 
-def kill_running_arg(path: str) -> str | None:
+def _query_processes(path: str) -> list[dict]:
     ps_command = '''
     Get-WmiObject Win32_Process -Filter "name = '%s'" |
     where {$_.CommandLine -like '*%s*'} |
@@ -48,17 +48,33 @@ def kill_running_arg(path: str) -> str | None:
         raise RuntimeError(f'Failed to get running chrome return={p.returncode}: {p.stderr}')
     if not p.stdout.strip():
         logger.info('没有运行中的浏览器')
-        return None
-
-    running_arg = ''
+        return []
     processes = json.loads(p.stdout)
-    processes = [processes] if isinstance(processes, dict) else processes
+    return [processes] if isinstance(processes, dict) else processes
+
+
+def _extract_running_arg(processes: list[dict]) -> str:
     for process in processes:
         cmd = process['CommandLine']
         if '--type=' not in cmd and '--no-startup-window' not in cmd:
             arg_list = cmd.split(maxsplit=1)[1:] if cmd[0] != '"' else cmd.split('"', maxsplit=2)[2:]
-            running_arg = ' '.join(arg_list)
-            break
+            return ' '.join(arg_list)
+    return ''
+
+
+def peek_running_arg(path: str) -> str | None:
+    '''like kill_running_arg but only queries, leaving the browser running'''
+    processes = _query_processes(path)
+    if not processes:
+        return None
+    return _extract_running_arg(processes)
+
+
+def kill_running_arg(path: str) -> str | None:
+    processes = _query_processes(path)
+    if not processes:
+        return None
+    running_arg = _extract_running_arg(processes)
 
     pids = ','.join(str(process['ProcessId']) for process in processes)
     ps_command = '''Get-Process -Id %s -ErrorAction SilentlyContinue|
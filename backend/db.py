@@ -1,21 +1,24 @@
 from __future__ import annotations
 import os
+import json
 import dataclasses
 import time
 import typing
 import functools
 import asyncio
+import logging
 
 import tortoise
 import tortoise.fields
 import tortoise.models
 import tortoise.functions
 import tortoise.transactions
-import tortoise.exceptions
 from tortoise.expressions import Q, Subquery
 
 from .config import get_basedir
 
+logger = logging.getLogger('db')
+
 
 CRC32_TABLE = [0] * 256
 for i in range(256):
@@ -27,8 +30,11 @@ for i in range(256):
             crc >>= 1
         CRC32_TABLE[i] = crc
 
+_UID_HASH_CACHE: dict[int, str] = {}
+_PENDING_ACCESS: dict[str, int] = {}
+
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class UserInfo:
     uid: int
     uid_hash: str
@@ -40,12 +46,16 @@ class UserInfo:
             self.uid_hash = self._generate_hash_from_uid(self.uid)
 
     @staticmethod
-    @functools.lru_cache(maxsize=1024)
     def _generate_hash_from_uid(uid: int) -> str:
-        crc = 0xFFFFFFFF
-        for byte in str(uid).encode():
-            crc = (crc >> 8) ^ CRC32_TABLE[(crc & 0xFF) ^ byte]
-        return f"{crc ^ 0xFFFFFFFF:08x}"
+        uid_hash = _UID_HASH_CACHE.get(uid)
+        if uid_hash is None:
+            crc = 0xFFFFFFFF
+            for byte in str(uid).encode():
+                crc = (crc >> 8) ^ CRC32_TABLE[(crc & 0xFF) ^ byte]
+            if len(_UID_HASH_CACHE) > 4096:
+                _UID_HASH_CACHE.clear()
+            uid_hash = _UID_HASH_CACHE[uid] = f"{crc ^ 0xFFFFFFFF:08x}"
+        return uid_hash
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, UserInfo):
@@ -56,6 +66,11 @@ class UserInfo:
             return self.uid_hash == other.uid_hash
         return False
 
+    def to_dict(self) -> dict:
+        # flat dict build, avoiding dataclasses.asdict's recursive deep copy
+        return {'uid': self.uid, 'uid_hash': self.uid_hash,
+                'username': self.username, 'privilege': self.privilege}
+
     @property
     def summary(self) -> str:
         if self.uid:
@@ -66,7 +81,7 @@ class UserInfo:
         return f'{self.username or "???"}'
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class SongInfo:
     id: str
     title: str
@@ -76,10 +91,18 @@ class SongInfo:
     decibel: float | None
     duration: int | None
     meta: dict = dataclasses.field(default_factory=dict)
+    composite_id: str = dataclasses.field(init=False)
 
-    @property
-    def composite_id(self) -> str:
-        return f'{self.source}-{self.id}'
+    def __post_init__(self):
+        self.composite_id = f'{self.source}-{self.id}'
+
+    def to_dict(self) -> dict:
+        # flat dict build, avoiding dataclasses.asdict's recursive deep copy;
+        # meta is passed through by reference and must not be mutated
+        return {'id': self.id, 'title': self.title, 'singer': self.singer,
+                'source': self.source, 'filename': self.filename,
+                'decibel': self.decibel, 'duration': self.duration,
+                'meta': self.meta, 'composite_id': self.composite_id}
 
     def as_meta(self) -> SongMeta:
         return SongMeta(
@@ -92,7 +115,7 @@ class SongInfo:
         )
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class SongMeta:
     id: str
     title: str
@@ -100,13 +123,20 @@ class SongMeta:
     source: str
     duration: int | None
     meta: dict = dataclasses.field(default_factory=dict)
+    composite_id: str = dataclasses.field(init=False)
 
-    @property
-    def composite_id(self) -> str:
-        return f'{self.source}-{self.id}'
+    def __post_init__(self):
+        self.composite_id = f'{self.source}-{self.id}'
+
+    def to_dict(self) -> dict:
+        # flat dict build, avoiding dataclasses.asdict's recursive deep copy;
+        # meta is passed through by reference and must not be mutated
+        return {'id': self.id, 'title': self.title, 'singer': self.singer,
+                'source': self.source, 'duration': self.duration,
+                'meta': self.meta, 'composite_id': self.composite_id}
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class PlaylistInfo:
     url: str
     title: str
@@ -114,6 +144,12 @@ class PlaylistInfo:
     song_ids: list[str]
     songs_meta: dict[str, dict]
 
+    def to_dict(self) -> dict:
+        # flat dict build, avoiding dataclasses.asdict's recursive deep copy;
+        # song_ids and songs_meta are passed through by reference and must not be mutated
+        return {'url': self.url, 'title': self.title, 'api_key': self.api_key,
+                'song_ids': self.song_ids, 'songs_meta': self.songs_meta}
+
 
 TORTOISE_CONFIG = {
     'connections': {'default': 'sqlite://db.sqlite3'},
@@ -133,6 +169,8 @@ def get_migrations_path():
 class Database:
     _initialized = False
     _init_lock = asyncio.Lock()
+    _access_flush_task: asyncio.Task | None = None
+    ACCESS_FLUSH_INTERVAL = 10
 
     @classmethod
     async def init(cls):
@@ -155,10 +193,26 @@ class Database:
             await command.init()
             # Apply all pending migrations
             await command.upgrade(run_in_transaction=True)
+            cls._access_flush_task = asyncio.create_task(cls._access_flush_worker())
             cls._initialized = True
 
+    @classmethod
+    async def _access_flush_worker(cls):
+        while True:
+            await asyncio.sleep(cls.ACCESS_FLUSH_INTERVAL)
+            try:
+                await CacheEntry.flush_pending_access()
+            except Exception:
+                # a transient DB error must not kill the worker, or pending
+                # access times would pile up unwritten for the rest of the run
+                logger.exception('error while flushing pending access times')
+
     @classmethod
     async def close(cls):
+        if cls._access_flush_task:
+            cls._access_flush_task.cancel()
+            cls._access_flush_task = None
+        await CacheEntry.flush_pending_access()
         await tortoise.Tortoise.close_connections()
         cls._initialized = False
 
@@ -214,7 +268,6 @@ class PlaylistEntry(tortoise.models.Model):
         return int(time.time() * 1e6)
 
     @classmethod
-    @Database.ensure_db
     async def remove_played_auto_entries(cls):
         await cls.filter(is_queued=False, user_name='', user_privilege='owner').delete()
 
@@ -244,6 +297,37 @@ class PlaylistEntry(tortoise.models.Model):
             meta=self.song_meta if isinstance(self.song_meta, dict) else {},
         )
 
+    @classmethod
+    def to_users(cls, entries: typing.Iterable[PlaylistEntry]) -> list[UserInfo]:
+        """Batch to_user(), bypassing dataclass __init__ for rows straight from DB"""
+        users = []
+        for entry in entries:
+            user = UserInfo.__new__(UserInfo)
+            user.uid = int(entry.user_id) if entry.user_id.isdigit() else 0
+            user.uid_hash = entry.uid_hash or (UserInfo._generate_hash_from_uid(user.uid) if user.uid else '')
+            user.username = entry.user_name
+            user.privilege = entry.user_privilege if entry.user_privilege in ('owner', 'admin', 'user') else 'user'
+            users.append(user)
+        return users
+
+    @classmethod
+    def to_songinfos(cls, entries: typing.Iterable[PlaylistEntry]) -> list[SongInfo]:
+        """Batch to_songinfo(), bypassing dataclass __init__ for rows straight from DB"""
+        songs = []
+        for entry in entries:
+            song = SongInfo.__new__(SongInfo)
+            song.id = entry.song_id
+            song.title = entry.song_title
+            song.singer = entry.song_artist
+            song.source = entry.song_source
+            song.filename = entry.song_file
+            song.decibel = entry.song_decibel
+            song.duration = entry.song_duration
+            song.meta = entry.song_meta if isinstance(entry.song_meta, dict) else {}
+            song.composite_id = f'{entry.song_source}-{entry.song_id}'
+            songs.append(song)
+        return songs
+
     @classmethod
     def create_entry(cls, user: UserInfo, song: SongInfo,
                      position: int = 0, is_auto_entry: bool = False,
@@ -269,7 +353,6 @@ class PlaylistEntry(tortoise.models.Model):
         entry._saved_in_db = False
         return entry
 
-    @Database.ensure_db
     async def new_entry_save(self, callback: typing.Callable[[], None] | None = None):
         await self.save(force_create=True)
         if callback:
@@ -277,26 +360,27 @@ class PlaylistEntry(tortoise.models.Model):
         return self
 
     @classmethod
-    @Database.ensure_db
     async def get_queued_entries(cls, limit: int = 50) -> list[PlaylistEntry]:
-        entries = await cls.filter(
+        return await cls.filter(
             is_queued=True,
         ).order_by('id').limit(limit)
-        return [entry for entry in entries]
 
     @classmethod
-    @Database.ensure_db
-    async def get_user_history_entries(cls, uid_hash: str, limit: int = 50) -> list[PlaylistEntry]:
-        """Get history entries of successful requests from user"""
-        entries = await cls.filter(
+    async def get_user_history_entries(cls, uid_hash: str, limit: int = 50,
+                                       only: tuple[str, ...] = ()) -> list[PlaylistEntry]:
+        """Get history entries of successful requests from user
+
+        Pass `only` to fetch a column subset, skipping JSON/blob deserialization for the rest"""
+        query = cls.filter(
             is_canceled=False,
             is_from_control=False,
             uid_hash=uid_hash
         ).order_by('-id').limit(limit)
-        return [entry for entry in entries]
+        if only:
+            query = query.only(*only)
+        return await query
 
     @classmethod
-    @Database.ensure_db
     async def get_past_history_entries(cls, page_num: int, size: int,
                                        hide_canceled: bool = False, filter='') -> tuple[int, list[PlaylistEntry]]:
         offset = (page_num - 1) * size
@@ -308,10 +392,9 @@ class PlaylistEntry(tortoise.models.Model):
             for keyword in filter.split():
                 query = query.filter(Q(song_title__icontains=keyword) | Q(song_artist__icontains=keyword) | Q(user_name__icontains=keyword))
         entries = await query.order_by('-id').offset(offset).limit(size)
-        return await query.count(), [entry for entry in entries]
+        return await query.count(), entries
 
     @classmethod
-    @Database.ensure_db
     async def get_recent_users(cls, limit: int = 10) -> list[UserInfo]:
         """Get recent users with unique uid"""
         subquery = cls.filter(
@@ -329,7 +412,6 @@ class PlaylistEntry(tortoise.models.Model):
             privilege='user'
         ) for user_id, username, uid_hash in (await query) if user_id.isdigit()]
 
-    @Database.ensure_db
     async def set_canceled(self):
         if self.is_auto_entry:
             await self.delete()
@@ -338,7 +420,6 @@ class PlaylistEntry(tortoise.models.Model):
             self.is_canceled = True
             await self.save(update_fields=['is_queued', 'is_canceled'])
 
-    @Database.ensure_db
     async def set_played(self):
         if self.is_auto_entry:
             await self.delete()
@@ -387,7 +468,6 @@ class QueryEntry(tortoise.models.Model):
         )
 
     @classmethod
-    @Database.ensure_db
     async def new_query(cls, user: UserInfo, query_text: str) -> QueryEntry:
         return await cls.create(
             query_text=query_text,
@@ -399,37 +479,30 @@ class QueryEntry(tortoise.models.Model):
         )
 
     @classmethod
-    @Database.ensure_db
     async def get_history_entries(cls, page_num: int, size: int) -> list[QueryEntry]:
         offset = (page_num - 1) * size
-        entries = await cls.all().order_by('-query_id').offset(offset).limit(size)
-        return [entry for entry in entries]
+        return await cls.all().order_by('-query_id').offset(offset).limit(size)
 
     @classmethod
-    @Database.ensure_db
     async def get_history_count(cls) -> int:
         return await cls.all().count()
 
     @classmethod
-    @Database.ensure_db
     async def discard_old_queries(cls, limit: int = 100):
         remove_ids = cls.all().order_by('-query_id').offset(limit).values('query_id')
         query = cls.filter(query_id__in=Subquery(remove_ids)).delete()
         await query
 
-    @Database.ensure_db
     async def increment_match_count(self, increment: int = 1):
         self.match_count = self.match_count + increment
         await self.save(update_fields=['match_count'])
 
-    @Database.ensure_db
     async def set_failed(self, reason: str = 'failed', additional_info: str | None = None):
         self.result = reason
         if additional_info:
             self.song_title = additional_info
         await self.save(update_fields=['result', 'song_title'])
 
-    @Database.ensure_db
     async def set_result(self, song_info: SongInfo):
         self.result = 'success'
         self.song_id = song_info.id
@@ -482,65 +555,91 @@ class CacheEntry(tortoise.models.Model):
         return self.is_valid
 
     async def update_access(self):
-        '''update last access to current timestamp'''
+        '''update last access to current timestamp, flushed to DB periodically in batches'''
         if int(time.time()) > self.last_accessed:
             self.last_accessed = int(time.time())
-            await self.save(update_fields=['last_accessed'])
+            _PENDING_ACCESS[self.cache_id] = self.last_accessed
+
+    @classmethod
+    async def flush_pending_access(cls):
+        '''write coalesced last_accessed updates in a single statement'''
+        if not _PENDING_ACCESS:
+            return
+        pending = list(_PENDING_ACCESS.items())
+        _PENDING_ACCESS.clear()
+        when_clauses = ' '.join('WHEN ? THEN ?' for _ in pending)
+        placeholders = ', '.join('?' * len(pending))
+        await tortoise.Tortoise.get_connection('default').execute_query(
+            f'UPDATE cache_entries SET last_accessed = CASE cache_id {when_clauses} END '
+            f'WHERE cache_id IN ({placeholders})',
+            [value for pair in pending for value in pair] + [cache_id for cache_id, _ in pending])
 
     @staticmethod
     def get_cache_id(api: API, song_id: str) -> str:
         return f'{api.key}-{song_id}'
 
     @classmethod
-    @Database.ensure_db
     async def get_cache_entry(cls, api: API, song_id: str) -> CacheEntry | None:
         return await cls.get_or_none(cache_id=cls.get_cache_id(api, song_id))
 
     @classmethod
-    @Database.ensure_db
     async def save_cache_entry(cls, api: API, song_id: str, song_source: str, song_file: str, song_title: str, song_singer: str, song_decibel: float | None, song_duration: int | None, song_meta: dict, file_size: int) -> CacheEntry:
-        entry, _ = await cls.update_or_create(
+        entry = cls(
             cache_id=cls.get_cache_id(api, song_id),
-            defaults={
-                'song_id': song_id,
-                'song_source': song_source,
-                'song_file': song_file,
-                'song_title': song_title,
-                'song_singer': song_singer,
-                'song_decibel': song_decibel,
-                'song_duration': song_duration,
-                'song_meta': song_meta,
-                'file_size': file_size,
-                'last_accessed': int(time.time()),
-                'is_valid': True,
-            }
+            song_id=song_id,
+            song_source=song_source,
+            song_file=song_file,
+            song_title=song_title,
+            song_singer=song_singer,
+            song_decibel=song_decibel,
+            song_duration=song_duration,
+            song_meta=song_meta,
+            file_size=file_size,
+            last_accessed=int(time.time()),
+            is_valid=True,
         )
+        # single-statement UPSERT instead of update_or_create's SELECT + INSERT/UPDATE
+        columns = ('cache_id', 'song_id', 'song_source', 'song_file', 'song_title', 'song_singer',
+                   'song_decibel', 'song_duration', 'song_meta', 'file_size', 'last_accessed', 'is_valid')
+        await tortoise.Tortoise.get_connection('default').execute_query(
+            f'INSERT INTO cache_entries ({", ".join(columns)}) '
+            f'VALUES ({", ".join("?" * len(columns))}) ON CONFLICT(cache_id) DO UPDATE SET '
+            f'{", ".join(f"{col} = excluded.{col}" for col in columns[1:])}',
+            [entry.cache_id, song_id, song_source, song_file, song_title, song_singer,
+             song_decibel, song_duration, json.dumps(song_meta), file_size, entry.last_accessed, True])
+        entry._saved_in_db = True
         return entry
 
     @classmethod
-    @Database.ensure_db
     async def save_new_meta_entry(cls, api: API, song_id: str, song_source: str, song_title: str, song_singer: str, song_meta: dict) -> CacheEntry:
         """Save meta in new entry if not exists"""
-        try:
-            return await cls.create(
-                cache_id=cls.get_cache_id(api, song_id),
-                song_id=song_id,
-                song_source=song_source,
-                song_file='meta-only',
-                song_title=song_title,
-                song_singer=song_singer,
-                song_decibel=None,
-                song_duration=None,
-                song_meta=song_meta,
-                file_size=0,
-                last_accessed=int(time.time()),
-                is_valid=False,
-            )
-        except tortoise.exceptions.IntegrityError:
-            return await cls.get(cache_id=cls.get_cache_id(api, song_id))
+        entry = cls(
+            cache_id=cls.get_cache_id(api, song_id),
+            song_id=song_id,
+            song_source=song_source,
+            song_file='meta-only',
+            song_title=song_title,
+            song_singer=song_singer,
+            song_decibel=None,
+            song_duration=None,
+            song_meta=song_meta,
+            file_size=0,
+            last_accessed=int(time.time()),
+            is_valid=False,
+        )
+        columns = ('cache_id', 'song_id', 'song_source', 'song_file', 'song_title', 'song_singer',
+                   'song_decibel', 'song_duration', 'song_meta', 'file_size', 'last_accessed', 'is_valid')
+        inserted, _ = await tortoise.Tortoise.get_connection('default').execute_query(
+            f'INSERT INTO cache_entries ({", ".join(columns)}) '
+            f'VALUES ({", ".join("?" * len(columns))}) ON CONFLICT(cache_id) DO NOTHING',
+            [entry.cache_id, song_id, song_source, 'meta-only', song_title, song_singer,
+             None, None, json.dumps(song_meta), 0, entry.last_accessed, False])
+        if not inserted:  # lost the race, another entry already exists
+            return await cls.get(cache_id=entry.cache_id)
+        entry._saved_in_db = True
+        return entry
 
     @classmethod
-    @Database.ensure_db
     async def get_total_size(cls) -> int:
         result = await cls.filter(is_valid=True).annotate(
             total=tortoise.functions.Sum('file_size')
@@ -548,7 +647,6 @@ class CacheEntry(tortoise.models.Model):
         return result[0]['total'] or 0
 
     @classmethod
-    @Database.ensure_db
     def get_entries_by_access(cls, limit: int = 50):
         return cls.all().order_by('last_accessed').limit(limit)
 
@@ -572,7 +670,6 @@ class PlaylistCacheEntry(tortoise.models.Model):
         )
 
     @classmethod
-    @Database.ensure_db
     async def get_playlist(cls, api_key: str, prefix: str, playlist_id: str, url: str) -> PlaylistInfo | None:
         """Get playlist from cache if it exists"""
         cache_id = f"{api_key}-{prefix}-{playlist_id}"
@@ -581,19 +678,22 @@ class PlaylistCacheEntry(tortoise.models.Model):
         return None
 
     @classmethod
-    @Database.ensure_db
     async def save_playlist(cls, api_key: str, prefix: str, playlist_id: str,
                             title: str, song_ids: list[str], songs_meta: dict[str, dict]) -> PlaylistCacheEntry:
         """Update or create playlist cache entry"""
         cache_id = f"{api_key}-{prefix}-{playlist_id}"
-        entry, _ = await cls.update_or_create(
+        entry = cls(
             cache_id=cache_id,
-            defaults={
-                'playlist_title': title[:255],
-                'song_ids': song_ids,
-                'songs_meta': songs_meta,
-            }
+            playlist_title=title[:255],
+            song_ids=song_ids,
+            songs_meta=songs_meta,
         )
+        await tortoise.Tortoise.get_connection('default').execute_query(
+            'INSERT INTO playlist_cache_entries (cache_id, playlist_title, song_ids, songs_meta) '
+            'VALUES (?, ?, ?, ?) ON CONFLICT(cache_id) DO UPDATE SET '
+            'playlist_title = excluded.playlist_title, song_ids = excluded.song_ids, songs_meta = excluded.songs_meta',
+            [cache_id, entry.playlist_title, json.dumps(song_ids), json.dumps(songs_meta)])
+        entry._saved_in_db = True
         return entry
 
 
@@ -606,7 +706,6 @@ class BannedUserCache(tortoise.models.Model):
         table = "banned_user_cache"
 
     @classmethod
-    @Database.ensure_db
     async def get_banned_username(cls, uid: int, expired_days: int | float = 3) -> str | None:
         '''get username if saved within expired_days'''
         if entry := await cls.get_or_none(user_id=str(uid)):
@@ -615,18 +714,14 @@ class BannedUserCache(tortoise.models.Model):
         return None
 
     @classmethod
-    @Database.ensure_db
-    async def get_banned_users(cls, uids: list[int]) -> dict[int, UserInfo]:
-        entries = await cls.filter(user_id__in=[str(uid) for uid in uids if uid])
-        return {int(entry.user_id): UserInfo(
-            uid=int(entry.user_id),
-            uid_hash='',
-            username=entry.user_name,
-            privilege='user'
-        ) for entry in entries if entry.user_id.isdigit()}
+    async def get_banned_users(cls, uids: list[int]) -> dict[int, str]:
+        '''map uid to cached username'''
+        rows = await cls.filter(
+            user_id__in=[str(uid) for uid in uids if uid]
+        ).values_list('user_id', 'user_name')
+        return {int(user_id): user_name for user_id, user_name in rows if user_id.isdigit()}
 
     @classmethod
-    @Database.ensure_db
     async def save_banned_user(cls, uid: int, username: str) -> UserInfo:
         if not username:
             raise ValueError('username cannot be empty')
@@ -657,7 +752,6 @@ class RecentBvidEntry(tortoise.models.Model):
         )
 
     @classmethod
-    @Database.ensure_db
     async def add_entry(cls, bvid: str, user: UserInfo):
         await cls.create(
             bvid=bvid,
@@ -668,13 +762,11 @@ class RecentBvidEntry(tortoise.models.Model):
         )
 
     @classmethod
-    @Database.ensure_db
     async def get_recent_bvid(cls, limit: int = 10) -> list[tuple[UserInfo, str]]:
         entries = await cls.all().order_by('-id').limit(limit)
         return [(entry.to_user(), entry.bvid) for entry in entries]
 
     @classmethod
-    @Database.ensure_db
     async def discard_old_bvid(cls, limit: int = 10):
         remove_ids = cls.all().order_by('-id').offset(limit).values('id')
         query = cls.filter(id__in=Subquery(remove_ids)).delete()
@@ -689,7 +781,6 @@ class PlayerStatus(tortoise.models.Model):
         table = "player_status"
 
     @classmethod
-    @Database.ensure_db
     async def get_status(cls) -> PlayerStatus:
         entry, _ = await cls.get_or_create(
             defaults={'paused': False},
@@ -40,26 +40,58 @@ def setup_logging(verbose=False):
                 self._thread.join(timeout=1)
             super().close()
 
+    user_path = os.path.expanduser('~')
+    ip_pattern = re.compile(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b')
+    danmaku_uid_pattern = re.compile(r'as uid=[1-9]\d*')
+    proxy_pattern = re.compile(r'//.*')
+    uid_pattern = re.compile(r'[1-9]\d*')
+    salt_pattern = re.compile(r'=.*')
+
     class MaskFilter(logging.Filter):
-        user_path = os.path.expanduser('~')
+        """Generic filter for handlers shared by many loggers, dispatching on record name"""
 
         def filter(self, record):
             if isinstance(record.msg, str):
-                record.msg = record.msg.replace(self.user_path, '~')
+                record.msg = record.msg.replace(user_path, '~')
                 if record.name != 'aiohttp.access':
-                    record.msg = re.sub(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b', '[masked IP address]', record.msg)
+                    record.msg = ip_pattern.sub('[masked IP address]', record.msg)
                 if record.name == 'danmaku':
-                    record.msg = re.sub(r'as uid=[1-9]\d*', 'as uid=***', record.msg)
+                    record.msg = danmaku_uid_pattern.sub('as uid=***', record.msg)
                 elif record.name == 'config':
                     if 'cache_proxy' in record.msg:
-                        record.msg = re.sub(r'//.*', '//***', record.msg)
+                        record.msg = proxy_pattern.sub('//***', record.msg)
                     elif 'uid' in record.msg:
-                        record.msg = re.sub(r'[1-9]\d*', '***', record.msg)
+                        record.msg = uid_pattern.sub('***', record.msg)
                     elif '_cookie_cloud_salt' in record.msg:
-                        record.msg = re.sub(r'=.*', '= ***', record.msg)
+                        record.msg = salt_pattern.sub('= ***', record.msg)
+            return True
+
+    class PathMaskFilter(logging.Filter):
+        """Specialized filter for loggers with no name-specific rules and no IP masking"""
+
+        def filter(self, record):
+            if isinstance(record.msg, str):
+                record.msg = record.msg.replace(user_path, '~')
             return True
 
-    def create_file_handler(filename: str, level: int = logging.DEBUG, max_mb: int = 5, backup_count: int = 3):
+    class PathIpMaskFilter(logging.Filter):
+        """Specialized filter for loggers with no name-specific rules"""
+
+        def filter(self, record):
+            if isinstance(record.msg, str):
+                record.msg = ip_pattern.sub('[masked IP address]', record.msg.replace(user_path, '~'))
+            return True
+
+    def make_mask_filter(logger_name: str | None) -> logging.Filter:
+        """Build a filter containing only the masking rules relevant to the logger"""
+        if logger_name is None:
+            return MaskFilter()  # shared handler, keep per-record dispatch
+        if logger_name == 'aiohttp.access':
+            return PathMaskFilter()
+        return PathIpMaskFilter()
+
+    def create_file_handler(filename: str, level: int = logging.DEBUG, max_mb: int = 5,
+                            backup_count: int = 3, logger_name: str | None = None):
         file_handler = logging.handlers.RotatingFileHandler(
             filename=os.path.join(log_dir, filename),
             maxBytes=max_mb * 1024 * 1024,
@@ -68,7 +100,7 @@ def setup_logging(verbose=False):
         )
         file_handler.setLevel(level)
         file_handler.setFormatter(formatter)
-        file_handler.addFilter(MaskFilter())
+        file_handler.addFilter(make_mask_filter(logger_name))
         return file_handler
 
     def create_console_handler(level: int):
@@ -81,7 +113,7 @@ def setup_logging(verbose=False):
         logger = logging.getLogger(logger_name)
         logger.propagate = False  # Prevent logs from propagating to root logger
         if filename:
-            logger.addHandler(create_file_handler(filename, **kwargs))
+            logger.addHandler(create_file_handler(filename, logger_name=logger_name, **kwargs))
         if console_level is not None:
             logger.addHandler(create_console_handler(console_level))
 
@@ -2,6 +2,7 @@ from __future__ import annotations
 import argparse
 import asyncio
 import logging
+import time
 import typing
 import os
 import webbrowser
@@ -9,8 +10,9 @@ import dataclasses
 import subprocess
 
 import aiohttp.web
+import orjson
 
-from .config import get_basedir, DataConfig, aiohttp_session
+from .config import get_basedir, DataConfig, create_aiohttp_session, json_response, async_timeout
 from .cookies import CookieManager
 from .danmaku import DanmakuRooms, DanmakuClient
 from .merger import Merger
@@ -20,6 +22,15 @@ from .version import get_version, get_environment
 from .logging import setup_logging
 
 
+_LOG_LEVELS = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+    'critical': logging.CRITICAL,
+}
+
+
 class Plugin(typing.Protocol):
     def __init__(self, server: Server):
         ...
@@ -31,6 +42,11 @@ class Plugin(typing.Protocol):
         ...
 
     def handle(self, msg):
+        """Handle a danmaku message dict.
+
+        The same dict object is shared across all plugins for each message,
+        so implementations must treat it as read-only.
+        """
         ...
 
 
@@ -41,6 +57,8 @@ class RootConfig(DataConfig):
 
 
 class Server:
+    ROOM_INFO_TTL = 30
+
     def __init__(self, root_app: aiohttp.web.Application, config_fn: str, baseurl: str):
         self._baseurl = baseurl
         self.config = RootConfig.create_root(config_fn)
@@ -49,9 +67,12 @@ class Server:
             self._logger = logging.getLogger('main_server')
             self._app = aiohttp.web.Application()
             self._merger = Merger()
+            self._http = create_aiohttp_session(timeout=aiohttp.ClientTimeout(total=10))
             self._local_danmaku = DanmakuRooms(cookies_getter=self.get_bilibili_cookies)
             self._closed = False
             self._worker: asyncio.Task | None = None
+            self._pending_closes: set[asyncio.Task] = set()
+            self._room_info_cache: dict[int, tuple[float, dict]] = {}
             self._sub_apps: set[str] = set()
 
             def _add_route(prefix: str, handler: aiohttp.typedefs.Handler):
@@ -86,10 +107,16 @@ class Server:
         await asyncio.gather(*[plugin.close() for plugin in self._plugins])
         await self._local_danmaku.close()
         await self._merger.close()
+        await asyncio.gather(*self._pending_closes, return_exceptions=True)
+        await self._http.close()
         self._closed = True
 
     async def _apply_roomid_config(self):
-        asyncio.ensure_future(self._merger.close())
+        # track the old merger's close so exceptions surface and rapid roomid
+        # changes don't pile up orphaned tasks
+        task = asyncio.create_task(self._merger.close(), name='merger-close')
+        self._pending_closes.add(task)
+        task.add_done_callback(self._pending_closes.discard)
         self._merger = Merger()
         if self.roomid:
             await self._local_danmaku.update_rooms([self.roomid])
@@ -98,9 +125,14 @@ class Server:
     async def _dispatch_worker(self):
         while not self._closed:
             try:
-                _, _, msg = await asyncio.wait_for(self._merger.next(), timeout=3)
-                for plugin in self._plugins:
-                    plugin.handle(msg)
+                async with async_timeout(3):
+                    first = await self._merger.next()
+                # each msg dict is dispatched to every plugin as-is, so any
+                # per-message work (parsing, serialization) happens only once
+                plugins = self._plugins
+                for _, _, msg in (first, *self._merger.drain_nowait()):
+                    for plugin in plugins:
+                        plugin.handle(msg)
             except (asyncio.CancelledError, KeyboardInterrupt):
                 raise
             except asyncio.TimeoutError:
@@ -149,59 +181,64 @@ class Server:
     async def roomid_config_handler(self, request: aiohttp.web.Request):
         if request.method == 'POST':
             try:
-                data = await request.json()
+                data = await request.json(loads=orjson.loads)
                 roomid = int(data['roomid'])
                 assert roomid > 0
                 self.roomid = roomid
+                self._room_info_cache.pop(roomid, None)
                 await self._apply_roomid_config()
             except Exception as e:
                 self._logger.exception('error while applying roomid config')
-                return aiohttp.web.json_response({'error': str(e)}, status=400)
+                return json_response({'error': str(e)}, status=400)
         if not self.roomid:
-            return aiohttp.web.json_response({'roomid': 0, 'uid': 0, 'short_id': 0, 'uname': ''})
+            return json_response({'roomid': 0, 'uid': 0, 'short_id': 0, 'uname': ''})
+        # UI polling hits this endpoint repeatedly; cache the upstream lookups briefly
+        ts, cached = self._room_info_cache.get(self.roomid, (0, None))
+        if cached is not None and time.monotonic() - ts < self.ROOM_INFO_TTL:
+            return json_response(cached)
         try:
-            async with aiohttp_session(timeout=aiohttp.ClientTimeout(total=10)) as session:
-                [roomid, short_id, uid], uname = await asyncio.gather(
-                    DanmakuClient.fetch_room_info(self.roomid, session),
-                    DanmakuClient.fetch_owner_uname(self.roomid, session),
-                )
-            return aiohttp.web.json_response({
-                'roomid': roomid, 'uid': uid, 'short_id': short_id, 'uname': uname})
+            [roomid, short_id, uid], uname = await asyncio.gather(
+                DanmakuClient.fetch_room_info(self.roomid, self._http),
+                DanmakuClient.fetch_owner_uname(self.roomid, self._http),
+            )
+            info = {'roomid': roomid, 'uid': uid, 'short_id': short_id, 'uname': uname}
+            self._room_info_cache[self.roomid] = (time.monotonic(), info)
+            return json_response(info)
         except Exception:
             self._logger.exception('error while fetching room info')
-            return aiohttp.web.json_response({
+            return json_response({
                 'roomid': self.roomid, 'uid': 'UID读取失败', 'short_id': self.roomid, 'uname': '用户名读取失败'})
 
     async def config_handler(self, request: aiohttp.web.Request):
         if request.method == 'POST':
-            data = await request.json()
+            data = await request.json(loads=orjson.loads)
             self.config.update(data)
         if request.method == 'DELETE':
-            data = await request.json()
+            data = await request.json(loads=orjson.loads)
             config = self.config
             for path in data['config_path']:
                 config = config.sub_configs[path]
             self._logger.info(f'resetting config {config._prefix or "root"}, recursive={data["recursive"]}, exclude={data["exclude"]}')
             config.reset_config(recursive=data['recursive'], exclude=data['exclude'])
-        return aiohttp.web.json_response(self.config.as_dict(recursive=True))
+        return json_response(self.config.as_dict(recursive=True))
 
     async def logging_handler(self, request: aiohttp.web.Request):
         if request.method == 'POST':
-            data = await request.json()
+            data = await request.json(loads=orjson.loads)
             logger = logging.getLogger('browser')
-            level: str = data['level'].lower()
-            msg: str = data['message']
-            getattr(logger, level)(msg)
-        return aiohttp.web.json_response({})
+            level = _LOG_LEVELS.get(data['level'].lower(), logging.INFO)
+            if logger.isEnabledFor(level):
+                logger.log(level, data['message'])
+        return json_response({})
 
     async def pid_handler(self, request: aiohttp.web.Request):
-        return aiohttp.web.json_response({'pid': os.getpid()})
+        return json_response({'pid': os.getpid()})
 
     async def baseurl_handler(self, request: aiohttp.web.Request):
-        return aiohttp.web.json_response({'baseurl': self._baseurl})
+        return json_response({'baseurl': self._baseurl})
 
     async def version_handler(self, request: aiohttp.web.Request):
-        return aiohttp.web.json_response({'version': get_version()})
+        return json_response({'version': get_version()})
 
 
 allowed_hosts: set[str] = set()
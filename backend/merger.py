@@ -11,46 +11,63 @@ logger = logging.getLogger('merger')
 
 
 class Merger:
+    TRIM_INTERVAL = 64
+    CMD_ONLY_WINDOW = 1
+
     def __init__(self, duration=300, buffer_size=1000, seen_history=5000):
-        self._queue: asyncio.Queue[Msg_Packet] | None = None
+        self._buffer: collections.deque[Msg_Packet] | None = None
+        self._ready: asyncio.Event | None = None
         self._tasks: set[asyncio.Task] = set()
         self._seen: collections.OrderedDict[tuple[str, str], float] = collections.OrderedDict()
+        self._seen_cmd_only: dict[str, float] = {}
         self._seen_limit = max(100, seen_history)
         self._duration = max(5, duration)
         self._buffer_size = max(100, buffer_size)
+        self._inserts_since_trim = 0
+        self._dropped = 0
 
     def init(self):
-        self._queue = asyncio.Queue(maxsize=self._buffer_size)
+        self._buffer = collections.deque(maxlen=self._buffer_size)
+        self._ready = asyncio.Event()
 
     async def queue_get(self):
-        if not self._queue:
-            self._queue = asyncio.Queue(maxsize=self._buffer_size)
-        return await self._queue.get()
+        if self._buffer is None or self._ready is None:
+            self.init()
+        while not self._buffer:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._buffer.popleft()
 
     def queue_put_nowait(self, value: Msg_Packet):
-        if not self._queue:
-            self._queue = asyncio.Queue(maxsize=self._buffer_size)
-        self._queue.put_nowait(value)
+        if self._buffer is None or self._ready is None:
+            self.init()
+        if len(self._buffer) == self._buffer_size:
+            # maxlen evicts the oldest instead of raising; count and log so
+            # sustained overflow is visible without spamming per-message
+            self._dropped += 1
+            if self._dropped % 1000 == 1:
+                logger.warning(f'merger buffer full, dropped {self._dropped} oldest messages so far')
+        self._buffer.append(value)
+        self._ready.set()
 
     @property
     def first_seen_item(self) -> tuple[tuple[str, str], float]:
-        try:
-            key = next(iter(self._seen))
-            return key, self._seen[key]
-        except StopIteration:
-            return ('', ''), 0
+        return next(iter(self._seen.items()), (('', ''), 0))
 
     @property
     def timestamp_limit(self):
+        return self._timestamp_limit(time.time())
+
+    def _timestamp_limit(self, now: float):
         if len(self._seen) < self._seen_limit:
-            return time.time() - self._duration
+            return now - self._duration
         else:
-            return (self.first_seen_item[1] + time.time()) / 2
+            return (self.first_seen_item[1] + now) / 2
 
-    def _trim_seen(self):
+    def _trim_seen(self, now: float):
         while len(self._seen) > self._seen_limit:
             self._seen.popitem(last=False)
-        ts_limit = time.time() - self._duration
+        ts_limit = now - self._duration
         while self.first_seen_item[1] < ts_limit:
             self._seen.popitem(last=False)
 
@@ -70,42 +87,65 @@ class Merger:
             logger.exception('Error while adding msg from generator')
 
     def add_iter(self, iterator: DanmakuAsyncIter):
-        for done in [task for task in self._tasks if task.done()]:
-            self._tasks.discard(done)
         task = asyncio.create_task(self._handle_generator(iterator))
         self._tasks.add(task)
-        asyncio.ensure_future(task)
-
-    async def next(self):
-        def _filter(entry: Msg_Packet):
-            _, timestamp, msg = entry
-            if timestamp < self.timestamp_limit:
+        task.add_done_callback(self._tasks.discard)
+
+    def _filter(self, entry: Msg_Packet):
+        _, timestamp, msg = entry
+        now = time.time()
+        if timestamp < self._timestamp_limit(now):
+            return False
+        key = Features.get_features(msg)
+        if key[1] is None:
+            # cmd without feature extraction: dedup on cmd alone over a short
+            # window, skipping the costly str(msg) repr for high-frequency spam
+            if now - self._seen_cmd_only.get(key[0], 0) < self.CMD_ONLY_WINDOW:
                 return False
-            cmd, feature = Features.get_features(msg)
-            if (cmd, feature) in self._seen:
-                return False
-            else:
-                self._seen[(cmd, feature)] = timestamp
-                self._trim_seen()
-                return True
+            self._seen_cmd_only[key[0]] = now
+            return True
+        # setdefault probes and inserts in one dict op, hashing the
+        # (potentially large) feature string only once per packet
+        size_before = len(self._seen)
+        self._seen.setdefault(key, timestamp)
+        if len(self._seen) == size_before:
+            return False
+        # trimming is amortized; _seen may briefly exceed the limit by TRIM_INTERVAL
+        self._inserts_since_trim += 1
+        if self._inserts_since_trim >= self.TRIM_INTERVAL:
+            self._inserts_since_trim = 0
+            self._trim_seen(now)
+        return True
 
+    async def next(self):
         while True:
             msg = await self.queue_get()
-            if _filter(msg):
+            if self._filter(msg):
                 verbose_logger.debug(f'recv new cmd: {str(msg)[:100]}')
                 return msg
 
+    def drain_nowait(self, limit: int = 32) -> list[Msg_Packet]:
+        """Pop up to `limit` already-buffered packets passing the dedup filter, without awaiting"""
+        batch: list[Msg_Packet] = []
+        while self._buffer and len(batch) < limit:
+            msg = self._buffer.popleft()
+            if self._filter(msg):
+                batch.append(msg)
+        return batch
+
 
 class Features:
     @classmethod
     def get_features(cls, msg):
         cmd = str(msg.get('cmd', ''))
-        if hasattr(cls, cmd):
+        if handler := cls._HANDLERS.get(cmd):
             try:
-                return cmd, str(getattr(cls, cmd)(msg))
+                return cmd, str(handler(msg))
             except Exception:
-                pass
-        return cmd, str(msg)
+                return cmd, str(msg)
+        # no extractor defined: let the caller dedup on cmd alone instead of
+        # paying for a full repr of the dict
+        return cmd, None
 
     @staticmethod
     def DANMU_MSG(msg):
@@ -122,6 +162,12 @@ class Features:
         data = msg['data']
         return [data['id'], data['1720455699'], data['price'], data['message']]
 
+    _HANDLERS = {
+        'DANMU_MSG': DANMU_MSG,
+        'SEND_GIFT': SEND_GIFT,
+        'SUPER_CHAT_MESSAGE': SUPER_CHAT_MESSAGE,
+    }
+
 
 if typing.TYPE_CHECKING:
     Msg_Packet = typing.Tuple[int, float, typing.Any]
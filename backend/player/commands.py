@@ -16,12 +16,11 @@ class BaseCmd:
             raise ValueError(f'Expected cmd value type {self.allowed_value_type()}, got {type(self.value).__name__}: "{self.value}"')
 
     def asdict(self) -> dict:
-        return {
-            'cmd': self.cmd_key(),
-            **dataclasses.asdict(self),
-        }
+        # commands only carry the scalar `value`, skip dataclasses.asdict's recursive copy
+        return {'cmd': self.cmd_key(), 'value': self.value}
 
     @classmethod
+    @functools.cache
     def cmd_key(cls) -> str:
         assert cls.__name__.endswith('Cmd')
         name = cls.__name__[:-len('Cmd')]
@@ -130,10 +129,7 @@ class ShowEventCmd(BaseCmd):
     value: BaseEvent
 
     def asdict(self) -> dict:
-        return {
-            **super().asdict(),
-            'value': self.value.asdict(),
-        }
+        return {'cmd': self.cmd_key(), 'value': self.value.asdict()}
 
 
 @register_command
@@ -3,9 +3,16 @@ import re
 import logging
 import os
 
+from ..config import async_timeout
+
 FFMPEG_UNAVAILABLE = False
 RETRY_UNEXPECTED = True
 
+MEAN_VOLUME_PATTERN = re.compile(r"mean_volume: ([-\d.]+) dB")
+
+# cap concurrent ffmpeg processes so bulk cache checks don't thrash CPU/disk
+FFMPEG_SEMAPHORE = asyncio.Semaphore(max(2, (os.cpu_count() or 2) // 2))
+
 logger = logging.getLogger('player.decibel')
 
 
@@ -23,25 +30,36 @@ async def get_decibel(filepath: str) -> float | None:
             "-f", "null", "-"
         ]
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-
-        try:
-            timeout = 5 + os.path.getsize(filepath) / 4e6
-            _, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
-            output = stderr.decode().replace('\r', '')
-        except asyncio.TimeoutError:
-            process.kill()
-            logger.warning(f"ffmpeg进程超时 ({timeout:.1f}秒): {filepath}")
-            return None
+        async with FFMPEG_SEMAPHORE:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+
+            try:
+                timeout = 5 + os.path.getsize(filepath) / 4e6
+                async with async_timeout(timeout):
+                    # stream stderr keeping only the tail: volumedetect prints its
+                    # summary at end-of-stream, the progress spam before it is useless
+                    tail = b''
+                    assert process.stderr is not None
+                    while chunk := await process.stderr.read(65536):
+                        tail = (tail + chunk)[-8192:]
+                    await process.wait()
+                # bounded to the 8 KiB tail, cheap enough to decode on the event loop
+                output = tail.decode('utf-8', 'ignore')
+            except asyncio.TimeoutError:
+                process.kill()
+                logger.warning(f"ffmpeg进程超时 ({timeout:.1f}秒): {filepath}")
+                return None
 
-        logger.debug(f"ffmpeg输出 {filepath}:\n{output}")
+        if logger.isEnabledFor(logging.DEBUG):
+            readable = output.replace('\r', '')
+            logger.debug(f"ffmpeg输出 {filepath}:\n{readable}")
 
         # Extract mean_volume from ffmpeg output
-        if match := re.search(r"mean_volume: ([-\d.]+) dB", output):
+        if match := MEAN_VOLUME_PATTERN.search(output):
             return float(match.group(1))
         else:
             logger.warning(f"无法用ffmpeg获取分贝: {filepath}")
@@ -1,4 +1,5 @@
 import dataclasses
+import functools
 from typing import Literal
 
 from ..db import UserInfo, SongInfo
@@ -9,12 +10,16 @@ class BaseEvent:
     user: UserInfo
 
     def asdict(self) -> dict:
-        return {
-            'type': self.event_key(),
-            **dataclasses.asdict(self),
-        }
+        # flat field walk instead of dataclasses.asdict's recursive deep copy;
+        # only directly-nested dataclasses (UserInfo/SongInfo) need converting
+        data: dict = {'type': self.event_key()}
+        for field in dataclasses.fields(self):
+            value = getattr(self, field.name)
+            data[field.name] = value.to_dict() if dataclasses.is_dataclass(value) else value
+        return data
 
     @classmethod
+    @functools.cache
     def event_key(cls) -> str:
         assert cls.__name__.endswith('Event')
         name = cls.__name__[:-len('Event')]
@@ -8,26 +8,27 @@ import urllib.parse
 import dataclasses
 import time
 import logging
-import hashlib
 import random
 import collections
 import functools
+import zlib
 
 import aiohttp
 import aiohttp.web
 import aiofiles.os
 import aiohttp_socks
+import orjson
 
 
 from ..api import BilibiliAPI, NeteaseMusicAPI, QQMusicAPI
 from ..api.common import SearchResult
 from ..db import PlaylistEntry, SongInfo, UserInfo, CacheEntry, BannedUserCache, QueryEntry
 from ..cookies import BilibiliCookieLoader, NeteaseMusicCookieLoader, QQMusicCookieLoader
-from ..config import DataConfig, create_aiohttp_session
+from ..config import DataConfig, create_aiohttp_session, json_response, async_timeout
 
 from .events import RequestFailEvent, CancelFailEvent, CancelSuccessEvent, SkipFailEvent, SkipSuccessEvent
 from .commands import PausedCmd, SeekCmd, ProgressCmd, CancelCmd, StatusCmd, ShowEventCmd, NextCmd, MoveToEndCmd, MoveToTopCmd, MoveDownCmd, SetIsFallbackCmd, UnsetIsFallbackCmd, VolumeReportCmd, player_commands
-from .bilibili_api import fetch_bili_uname, fetch_recent_users
+from .bilibili_api import USER_AGENT, fetch_bili_uname, fetch_recent_users
 from .decibel import get_decibel
 from .exceptions import KeywordBannedError, NoQueryMatchError, NoPlayurlError
 from .query import PlayerQuery
@@ -36,6 +37,36 @@ from .status import PlayerStatusWrapper
 from .unshield import unshield, UnsheildRuleConfig
 
 
+# compiled once: both run on hot paths (every danmaku / every config update)
+BVID_RE = re.compile(BilibiliAPI.BVID_PATTERN)
+CACHE_PROXY_SCHEME_RE = re.compile(r'^(https?|socks[45]?)$')
+
+UA_HEADERS = {'user-agent': USER_AGENT}
+
+
+# validate runs on every assignment of these keys; cache the urlparse/basename
+# work since the same few values are re-validated on config reloads
+@functools.lru_cache(maxsize=8)
+def _validate_cache_basedir(value: str) -> str | None:
+    value = os.path.basename(value)
+    if value in ('', '.', '..', 'db.sqlite3', 'config.json', 'logs', 'yumi_player.exe'):
+        return None
+    return value
+
+
+@functools.lru_cache(maxsize=8)
+def _validate_cache_proxy(value: str) -> str | None:
+    parsed = urllib.parse.urlparse(value)
+    if not CACHE_PROXY_SCHEME_RE.match(parsed.scheme) or not parsed.hostname:
+        return None
+    return value
+
+
+def _ws_dumps(data) -> str:
+    """orjson-encoded text payload for websocket frames (frontend expects text, not binary)"""
+    return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 def handle_option(func):
     @functools.wraps(func)
     async def wrapper(self, request: aiohttp.web.Request):
@@ -52,18 +83,38 @@ class PlayerBannedConfig(DataConfig):
 
     def validate(self, key: str, value: typing.Any):
         if key == 'banned_uids':
-            return tuple(int(uid) for uid in collections.OrderedDict.fromkeys(str(uid) for uid in value) if uid.isdigit())
+            self.__dict__.pop('banned_uid_set', None)
+            self.__dict__.pop('banned_uid_hash_set', None)
+            return tuple(int(uid) for uid in dict.fromkeys(str(uid) for uid in value) if uid.isdigit())
         if key == 'banned_keywords':
-            return tuple(collections.OrderedDict.fromkeys(str(w).lower() for w in value))
+            self.__dict__.pop('banned_regex', None)
+            return tuple(dict.fromkeys(str(w).lower() for w in value))
         return value
 
+    @functools.cached_property
+    def banned_regex(self) -> re.Pattern | None:
+        """Single automaton over all banned keywords, rebuilt only when they change"""
+        if not self.banned_keywords:
+            return None
+        return re.compile('|'.join(re.escape(w) for w in self.banned_keywords))
+
     @property
     def banned_users(self) -> list[UserInfo]:
         return [UserInfo(int(uid), '', '', 'user') for uid in self.banned_uids if isinstance(uid, int) or uid.isdigit()]
 
     @property
-    def banned_keywords_lowercase(self) -> list[str]:
-        return [str(w).lower() for w in self.banned_keywords]
+    def banned_keywords_lowercase(self) -> tuple[str, ...]:
+        # validate already stores banned_keywords lowercased
+        return self.banned_keywords
+
+    @functools.cached_property
+    def banned_uid_set(self) -> frozenset[int]:
+        return frozenset(user.uid for user in self.banned_users)
+
+    @functools.cached_property
+    def banned_uid_hash_set(self) -> frozenset[str]:
+        """uid CRC hashes of banned users, for danmaku users that only carry uid_hash"""
+        return frozenset(user.uid_hash for user in self.banned_users)
 
 
 @dataclasses.dataclass
@@ -86,19 +137,17 @@ class PlayerConfig(DataConfig):
 
     def validate(self, key: str, value: typing.Any):
         if key == 'cache_basedir':
-            value = os.path.basename(str(value))
-            if value in ['', '.', '..', 'db.sqlite3', 'config.json', 'logs', 'yumi_player.exe']:
-                return None
+            return _validate_cache_basedir(str(value))
         if key == 'cache_proxy':
-            parsed = urllib.parse.urlparse(str(value))
-            if not re.match(r'^(https?|socks[45]?)$', parsed.scheme) or not parsed.hostname:
-                return None
+            return _validate_cache_proxy(str(value))
         if key == 'cache_limit_mb':
             return max(500, int(value))
         return value
 
 
 class Player:
+    STATUS_DEBOUNCE = 0.1
+
     def __init__(self, server: Server):
         self._server = server
         self._logger = logging.getLogger('player')
@@ -114,10 +163,32 @@ class Player:
         self._downloader = MusicDownloader(self)
         self._fallback = FallbackLists(self)
 
-        self._ws_clients: set[aiohttp.web.WebSocketResponse] = set()
+        self._ws_clients: dict[aiohttp.web.WebSocketResponse, asyncio.Queue[str]] = {}
         self._last_ws_sent = 0
+        self._status_dirty = False
+        self._broadcast_task: asyncio.Task | None = None
+        self._status_cache: dict | None = None
         self._heartbeat_task = asyncio.create_task(self._heartbeat_worker())
-        self._last_requested: dict[int | str, float] = {}
+        self._last_requested: collections.OrderedDict[int | str, float] = collections.OrderedDict()
+        self._recent_successes: dict[str, collections.deque[float]] = {}
+        self._owner_user_cache: UserInfo | None = None
+        self._cmd_table_cache: tuple[tuple[str, ...], dict[str, typing.Callable]] = ((), {})
+        # type-keyed dispatch: one dict hash instead of a chain of isinstance checks
+        self._cmd_handlers: dict[type[BaseCmd], typing.Callable[[typing.Any], None]] = {
+            PausedCmd: self._on_paused_cmd,
+            NextCmd: self._on_next_cmd,
+            MoveToEndCmd: lambda c: self._playlist.move_to_end(c.value),
+            MoveToTopCmd: lambda c: self._playlist.move_to_top(c.value),
+            MoveDownCmd: lambda c: self._playlist.move_down(int(c.value)),
+            SeekCmd: self._on_progress_cmd,
+            ProgressCmd: self._on_progress_cmd,
+            CancelCmd: lambda c: self._playlist.remove_canceled_entry(int(c.value)),
+            SetIsFallbackCmd: lambda c: self._playlist.update_is_fallback(c.value, True),
+            UnsetIsFallbackCmd: lambda c: self._playlist.update_is_fallback(c.value, False),
+            VolumeReportCmd: self._on_volume_report_cmd,
+            ShowEventCmd: self._on_noop_cmd,
+            StatusCmd: self._on_noop_cmd,
+        }
 
         self._app.router.add_route('GET', '/ws', self.ws_handler)
         self._app.router.add_route('GET', '/file', self._downloader.serve_file_handler)
@@ -148,7 +219,7 @@ class Player:
     async def _heartbeat_worker(self):
         while True:
             await asyncio.sleep(2)
-            if time.time() - self._last_ws_sent > 1.5:
+            if time.monotonic() - self._last_ws_sent > 1.5:
                 self.dispatch_status()
 
     async def close(self):
@@ -160,17 +231,51 @@ class Player:
 
     @property
     def owner_user(self):
-        return UserInfo(self._server.room_uid or 0, '', '', 'owner')
+        # reused across messages; rebuilt only when the room uid changes
+        uid = self._server.room_uid or 0
+        if self._owner_user_cache is None or self._owner_user_cache.uid != uid:
+            self._owner_user_cache = UserInfo(uid, '', '', 'owner')
+        return self._owner_user_cache
 
     @property
     def status(self):
-        return {
-            'cached_songs': [dataclasses.asdict(song) for song in self._fallback.cached_song_list],
-            'config': self._config.as_dict(recursive=False, exclude_keys=['cache_proxy', 'cache_basedir', 'cache_limit_mb']),
-            'recent_bvid': self._recent_bvid.as_list(),
-            **self._playlist.status,
-            **self._player_status.as_dict(),
-        }
+        # memoized until the end of the current loop tick: broadcasts and the
+        # initial ws push in the same tick reuse one build instead of
+        # re-serializing the cached song list each time
+        if self._status_cache is None:
+            self._status_cache = {
+                'cached_songs': [song.to_dict() for song in self._fallback.cached_song_list],
+                'config': self._config.as_dict(recursive=False, exclude_keys=['cache_proxy', 'cache_basedir', 'cache_limit_mb']),
+                'recent_bvid': self._recent_bvid.as_list(),
+                **self._playlist.status,
+                **self._player_status.as_dict(),
+            }
+            asyncio.get_running_loop().call_soon(self._clear_status_cache)
+        return self._status_cache
+
+    def _clear_status_cache(self):
+        self._status_cache = None
+
+    def _on_paused_cmd(self, command: PausedCmd):
+        self._player_status.paused = bool(command.value)
+
+    def _on_next_cmd(self, command: NextCmd):
+        if entry := self._playlist.current_entry:
+            if command.value == entry.id:
+                self._player_status.progress = 0
+                self._player_status.reported_volume = None
+                self._playlist.remove_played_entry(entry.id)
+            else:
+                self._logger.warning(f'id={command.value} 与当前播放歌曲不匹配，忽略next命令')
+
+    def _on_progress_cmd(self, command: SeekCmd | ProgressCmd):
+        self._player_status.progress = int(command.value)
+
+    def _on_volume_report_cmd(self, command: VolumeReportCmd):
+        self._player_status.reported_volume = float(command.value)
+
+    def _on_noop_cmd(self, command: ShowEventCmd | StatusCmd):
+        pass
 
     def _handle_player_command(self, command: BaseCmd):
         """Handle a player command"""
@@ -178,34 +283,8 @@ class Player:
             if not isinstance(command, (StatusCmd, ProgressCmd)):
                 self._logger.debug(f'处理播放器命令：{command}')
 
-            if isinstance(command, PausedCmd):
-                self._player_status.paused = bool(command.value)
-            elif isinstance(command, NextCmd):
-                if entry := self._playlist.current_entry:
-                    if command.value == entry.id:
-                        self._player_status.progress = 0
-                        self._player_status.reported_volume = None
-                        self._playlist.remove_played_entry(entry.id)
-                    else:
-                        self._logger.warning(f'id={command.value} 与当前播放歌曲不匹配，忽略next命令')
-            elif isinstance(command, MoveToEndCmd):
-                self._playlist.move_to_end(command.value)
-            elif isinstance(command, MoveToTopCmd):
-                self._playlist.move_to_top(command.value)
-            elif isinstance(command, MoveDownCmd):
-                self._playlist.move_down(int(command.value))
-            elif isinstance(command, (SeekCmd, ProgressCmd)):
-                self._player_status.progress = int(command.value)
-            elif isinstance(command, CancelCmd):
-                self._playlist.remove_canceled_entry(int(command.value))
-            elif isinstance(command, SetIsFallbackCmd):
-                self._playlist.update_is_fallback(command.value, True)
-            elif isinstance(command, UnsetIsFallbackCmd):
-                self._playlist.update_is_fallback(command.value, False)
-            elif isinstance(command, VolumeReportCmd):
-                self._player_status.reported_volume = float(command.value)
-            elif isinstance(command, (ShowEventCmd, StatusCmd)):
-                pass
+            if handler := self._cmd_handlers.get(type(command)):
+                handler(command)
             else:
                 self._logger.warning(f'未知命令：{command}')
         except Exception:
@@ -213,19 +292,59 @@ class Player:
 
         self.check_playlist_empty()
 
+        if isinstance(command, (StatusCmd, ProgressCmd)):
+            # bursts of progress/status ticks are coalesced into one status
+            # rebuild and one broadcast per debounce window
+            self._status_dirty = True
+            if self._broadcast_task is None or self._broadcast_task.done():
+                self._broadcast_task = asyncio.create_task(self._flush_status())
+        else:
+            self._status_dirty = False
+            self._broadcast(command)
+
+    async def _flush_status(self):
+        await asyncio.sleep(self.STATUS_DEBOUNCE)
+        if self._status_dirty:
+            self._status_dirty = False
+            self._broadcast(StatusCmd())
+
+    def _broadcast(self, command: BaseCmd):
         data = {'command': command.asdict(), 'status': self.status}
 
         if not isinstance(command, (StatusCmd, ProgressCmd)):
             self._logger.debug(f'发送命令{command.type}处理后状态: {data["status"]}')
-        self._last_ws_sent = time.time()
-        asyncio.ensure_future(asyncio.gather(*[ws.send_json(data) for ws in self._ws_clients]))
+        self._last_ws_sent = time.monotonic()
+        # serialize once and fan out the string, not once per client
+        payload = _ws_dumps(data)
+        for queue in self._ws_clients.values():
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # slow client: drop its oldest pending update instead of
+                # queueing unbounded
+                queue.get_nowait()
+                queue.put_nowait(payload)
+
+    async def _ws_sender(self, ws: aiohttp.web.WebSocketResponse, queue: asyncio.Queue[str]):
+        """Drain one client's outbound queue so broadcasts never await slow sockets"""
+        try:
+            while True:
+                await ws.send_str(await queue.get())
+        except (asyncio.CancelledError, ConnectionResetError):
+            pass
+        except Exception:
+            self._logger.exception('客户端ws发送失败')
 
     async def ws_handler(self, request: aiohttp.web.Request):
-        ws = aiohttp.web.WebSocketResponse(heartbeat=10, receive_timeout=15)
+        # permessage-deflate would re-compress the shared broadcast payload per
+        # client; connections are local-network so skip compression entirely
+        ws = aiohttp.web.WebSocketResponse(compress=False, heartbeat=10, receive_timeout=15)
         await ws.prepare(request)
+        queue: asyncio.Queue[str] = asyncio.Queue(maxsize=32)
+        queue.put_nowait(_ws_dumps({'status': self.status}))
+        sender = asyncio.create_task(self._ws_sender(ws, queue))
         try:
-            self._ws_clients.add(ws)
-            await ws.send_json({'status': self.status})
+            self._ws_clients[ws] = queue
             async for msg in ws:
                 if not msg.type == aiohttp.WSMsgType.TEXT:
                     continue
@@ -238,7 +357,8 @@ class Player:
                 except Exception:
                     self._logger.exception('客户端ws消息解析错误')
         finally:
-            self._ws_clients.discard(ws)
+            sender.cancel()
+            self._ws_clients.pop(ws, None)
         return ws
 
     def dispatch(self, event: BaseEvent):
@@ -258,11 +378,22 @@ class Player:
         except Exception:
             self._logger.exception(f'弹幕服务器消息处理失败: {msg}')
 
+    def _may_handle_message(self, msg: str) -> bool:
+        """Whether the message could carry a BVID or a command, judged without allocations"""
+        if 'av' in msg or 'BV' in msg or 'bv' in msg:
+            return True
+        msg_cmd = next(iter(msg.split()), None)
+        return msg_cmd is not None and msg_cmd in self._command_table()
+
     def _handle_danmu_msg(self, info):
-        msg = info[1].strip()
+        msg = str(info[1]).strip()
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug(f'收到"{info[2][1]} ({info[2][0]})"的弹幕: {msg}')
+        # ordinary chatter skips UserInfo construction entirely
+        if not self._may_handle_message(msg):
+            return
         user = self._make_userinfo(info[2][0], info[0][7], info[2][1], info[2][2])
-        self._logger.debug(f'收到"{user.summary}"的弹幕: {msg}')
-        self._handle_message_danmaku(user, str(msg))
+        self._handle_message_danmaku(user, msg)
 
     def _handle_superchat(self, data):
         msg = data['message'].strip()
@@ -281,55 +412,87 @@ class Player:
             user.privilege = 'owner'
         return user
 
-    def _handle_message_danmaku(self, user: UserInfo, msg: str):
-        commands = {
-            self._config.request_cmd: self._handle_query,
-            self._config.cancel_cmd: self._handle_cancel,
-            self._config.skip_cmd: self._handle_skip,
-            self._config.skipend_cmd: self._handle_skip,
-        }
+    def _command_table(self) -> dict[str, typing.Callable[[UserInfo, str], typing.Coroutine]]:
+        """Danmaku command dispatch dict, rebuilt only when the command words change"""
+        key = (self._config.request_cmd, self._config.cancel_cmd,
+               self._config.skip_cmd, self._config.skipend_cmd)
+        if key != self._cmd_table_cache[0]:
+            table: dict[str, typing.Callable] = {}
+            for cmd, handler in zip(key, (self._handle_query, self._handle_cancel,
+                                          self._handle_skip, self._handle_skip)):
+                if cmd:
+                    table.setdefault(cmd, handler)
+            self._cmd_table_cache = (key, table)
+        return self._cmd_table_cache[1]
 
-        for match in re.findall(BilibiliAPI.BVID_PATTERN, msg):
-            self._logger.info(f'从"{user.summary}"的弹幕匹配BV号 {match}')
-            asyncio.create_task(self._recent_bvid.record_bvid(user, match))
+    def _handle_message_danmaku(self, user: UserInfo, msg: str):
+        # cheap substring probe before firing up the regex engine: the pattern
+        # only matches 'av' + digits or a 12-char BV id
+        if 'av' in msg or 'BV' in msg or 'bv' in msg:
+            for match in BVID_RE.findall(msg):
+                self._logger.info(f'从"{user.summary}"的弹幕匹配BV号 {match}')
+                asyncio.create_task(self._recent_bvid.record_bvid(user, match))
 
         msg = msg.strip()
         msg_cmd = next(iter(msg.split()), None)
-        if not (handler := next((h for cmd, h in commands.items() if cmd and cmd == msg_cmd), None)):
+        if msg_cmd is None or not (handler := self._command_table().get(msg_cmd)):
             return
 
         if self._config.request_handler_off:
             self._logger.debug(f'指令未启用，忽略"{user.summary}"的消息: "{msg}"')
             return
 
-        if (banned := next((b for b in self._banned_config.banned_users if user == b), None)):
-            self._logger.info(f'拒绝黑名单用户"{user.username}"(UID: {banned.uid})的指令')
+        # set lookups mirroring UserInfo.__eq__: match uid when known, uid hash otherwise
+        if ((user.uid and user.uid in self._banned_config.banned_uid_set) or (not user.uid and user.uid_hash in self._banned_config.banned_uid_hash_set)):
+            self._logger.info(f'拒绝黑名单用户"{user.username}"(UID: {user.uid or user.uid_hash})的指令')
             return
         self._logger.info(f'处理"{user.summary}"的弹幕指令: {msg}')
 
         asyncio.create_task(handler(user, msg))
 
+    def _success_ring(self, uid_hash: str) -> collections.deque[float]:
+        """Per-user ring of recent success timestamps, resized if the config limit changed"""
+        ring = self._recent_successes.get(uid_hash)
+        if ring is None or ring.maxlen != self._config.rate_limit_success_count:
+            ring = collections.deque(ring or (), maxlen=self._config.rate_limit_success_count)
+            self._recent_successes[uid_hash] = ring
+        return ring
+
     async def _check_rate_limit(self, user: UserInfo) -> typing.Literal['request-rate-limit', 'success-rate-limit'] | None:
         """Check if the user is rate limited, return the reason if limited, otherwise None"""
-        if self._last_requested.get(user.uid or user.uid_hash, 0) + self._config.rate_limit_request > time.time():
+        # monotonic timestamps: immune to wall-clock jumps and cheaper on some platforms
+        now = time.monotonic()
+        if self._last_requested.get(user.uid or user.uid_hash, 0) + self._config.rate_limit_request > now:
             return 'request-rate-limit'
 
+        if (ring := self._recent_successes.get(user.uid_hash)) is not None:
+            # warm path: the in-memory ring answers without a SQLite round-trip
+            if len(ring) >= self._config.rate_limit_success_count and ring[0] > now - self._config.rate_limit_success_duration:
+                return 'success-rate-limit'
+            return None
+
+        # cold start: consult the database once, then seed the ring
         history = await PlaylistEntry.get_user_history_entries(
             user.uid_hash,
-            limit=self._config.rate_limit_success_count
+            limit=self._config.rate_limit_success_count,
+            only=('id', 'created_at')
         )
+        ring = self._success_ring(user.uid_hash)
+        wall_now = time.time()
+        for entry in reversed(history):  # -id ordering puts the oldest entry last
+            ring.append(now - (wall_now - entry.created_at.timestamp()))
         if len(history) >= self._config.rate_limit_success_count:
-            oldest_allowed_time = time.time() - self._config.rate_limit_success_duration
-            oldest_entry = history[-1]  # Last entry is oldest due to -id ordering
+            # created_at comes from the database, so this one stays wall-clock
+            oldest_allowed_time = wall_now - self._config.rate_limit_success_duration
+            oldest_entry = history[-1]
             if oldest_entry.created_at.timestamp() > oldest_allowed_time:
                 return 'success-rate-limit'
 
     def _check_keyword_banned(self, query_or_title: str) -> str | None:
         '''Check if the query or title contains any banned keywords, return the keyword if found otherwise None'''
-        query_or_title = query_or_title.lower()
-        for keyword in self._banned_config.banned_keywords_lowercase:
-            if keyword in query_or_title:
-                return keyword
+        if regex := self._banned_config.banned_regex:
+            if match := regex.search(query_or_title.lower()):
+                return match.group(0)
         return None
 
     def unsheild(self, text: str) -> str:
@@ -340,7 +503,14 @@ class Player:
 
         if limit_reason := await self._check_rate_limit(user):
             return self.dispatch(RequestFailEvent(user, query_text, limit_reason))
-        self._last_requested[user.uid] = self._last_requested[user.uid_hash] = time.time()
+        now = time.monotonic()
+        # evict stale entries from the left so the map stays bounded over long streams
+        ttl = max(self._config.rate_limit_request, 60)
+        while self._last_requested and next(iter(self._last_requested.values())) + ttl < now:
+            self._last_requested.popitem(last=False)
+        for key in (user.uid, user.uid_hash):
+            self._last_requested[key] = now
+            self._last_requested.move_to_end(key)
 
         try:
             query = PlayerQuery(self, user, query_text)
@@ -355,11 +525,10 @@ class Player:
     async def _handle_cancel(self, user: UserInfo, msg: str):
         if msg != self._config.cancel_cmd:
             return
-        for entry in reversed(self._playlist.pending_main_entries):
-            if user == entry.to_user():
-                self._handle_player_command(CancelCmd(entry.id))
-                self.dispatch(CancelSuccessEvent(user, entry.id, entry.song_title))
-                return
+        if entry := self._playlist.latest_pending_entry_of(user):
+            self._handle_player_command(CancelCmd(entry.id))
+            self.dispatch(CancelSuccessEvent(user, entry.id, entry.song_title))
+            return
         self.dispatch(CancelFailEvent(user, None, 'no-match'))
 
     async def _handle_skip(self, user: UserInfo, msg: str):
@@ -393,6 +562,9 @@ class Player:
         self._logger.info(f'添加 "{song_info.title} / {song_info.singer}" ({song_info.source}: {song_info.id}) 到播放列表' + ("（自动播放）" if is_auto_entry else f'，由"{user.summary}"添加'))
         await self._playlist.add_song(user, song_info, is_auto_entry, is_from_control, is_fallback)
 
+        if not is_auto_entry and user.uid_hash:
+            self._success_ring(user.uid_hash).append(time.monotonic())
+
         if query:
             query.dispatch_success(song_info)
         self._downloader.remove_oversized_cache()
@@ -414,12 +586,16 @@ class Player:
             self._logger.exception("后备歌曲添加失败")
 
     async def _fetch_recent_users(self) -> list[UserInfo]:
-        recent_users: collections.OrderedDict[str, UserInfo] = collections.OrderedDict()
+        recent_users: dict[str, UserInfo] = {}
 
         for user_list in await asyncio.gather(
             PlaylistEntry.get_recent_users(),
-            fetch_recent_users(self._server.roomid, self._server.room_uid or 0)
+            fetch_recent_users(self._server._http, self._server.roomid, self._server.room_uid or 0),
+            return_exceptions=True,
         ):
+            if isinstance(user_list, BaseException):
+                self._logger.warning(f'获取最近用户失败: {user_list!r}')
+                continue
             for user in user_list:
                 recent_users[str(user.uid)] = user
         recent_users.pop(str(self._server.room_uid), None)
@@ -427,8 +603,7 @@ class Player:
 
     async def handle_recent_users(self, request: aiohttp.web.Request):
         recent_users = await self._fetch_recent_users()
-        return aiohttp.web.json_response(status=200, data=[
-            dataclasses.asdict(user) for user in recent_users])
+        return json_response([user.to_dict() for user in recent_users])
 
     async def _get_banned_usernames(self) -> dict[int, str]:
         uids = [user.uid for user in self._banned_config.banned_users]
@@ -436,11 +611,12 @@ class Player:
             return {}
         users = await BannedUserCache.get_banned_users(uids)
         for uid in set(uids) - set(users):
-            if username := await fetch_bili_uname(uid):
-                users[uid] = await BannedUserCache.save_banned_user(uid, username)
+            if username := await fetch_bili_uname(self._server._http, uid):
+                await BannedUserCache.save_banned_user(uid, username)
+                users[uid] = username
             else:
                 break
-        return {user.uid: user.username for user in users.values()}
+        return users
 
     async def handle_add_banned_user(self, request: aiohttp.web.Request):
         if request.method == 'POST':
@@ -453,10 +629,10 @@ class Player:
                 if cached := await BannedUserCache.get_banned_username(uid, expired_days=3):
                     username = cached
                 else:
-                    if username := await fetch_bili_uname(uid):
+                    if username := await fetch_bili_uname(self._server._http, uid):
                         await BannedUserCache.save_banned_user(uid, username)
             self._banned_config.banned_uids = (*self._banned_config.banned_uids, uid)
-        return aiohttp.web.json_response(status=200, data=(await self._get_banned_usernames()))
+        return json_response(await self._get_banned_usernames())
 
     @handle_option
     async def handle_add_bvid(self, request: aiohttp.web.Request):
@@ -475,24 +651,26 @@ class Player:
         for api in self._downloader.apis:
             if match_id := api.match_song_id(query):
                 song_meta = await self._downloader.get_single_meta(api, match_id)
-                return aiohttp.web.json_response(status=200, data={
-                    api.key: [dataclasses.asdict(SearchResult(
+                return json_response({
+                    api.key: [SearchResult(
                         id=song_meta.id,
                         title=song_meta.title,
                         singer=song_meta.singer,
                         meta=song_meta.meta
-                    ))]
+                    ).to_dict()]
                 })
 
         async def _query(api: API):
             try:
-                return api.key, await api.search(query)
+                # bound each source so one slow API can't stall the whole response
+                async with async_timeout(5):
+                    return api.key, await api.search(query)
             except Exception:
                 self._logger.exception(f'从{api.key}搜索"{query}"失败')
                 return api.key, []
 
-        return aiohttp.web.json_response(status=200, data={
-            api_key: [dataclasses.asdict(song) for song in result]
+        return json_response({
+            api_key: [song.to_dict() for song in result]
             for api_key, result in await asyncio.gather(*[_query(api) for api in self._downloader.apis])
         })
 
@@ -543,7 +721,7 @@ class FallbackList:
         self._lists = lists
         self._api = api
         self._playlist_info = playlist_info
-        self._recent_chosen: set[str] = set()
+        self._unchosen: list[str] = []  # swap-and-pop pool for the current shuffle cycle
         self._last_chosen: str | None = None
         self._cached_next: SongInfo | None = None
         self._failed_to_load: dict[str, float] = {}
@@ -611,28 +789,42 @@ class FallbackList:
             }
             index += 1
 
+        self._unchosen.clear()  # song ids changed, rebuild the shuffle pool next pick
         asyncio.create_task(self._api.save_updated_playlist(playlist))
 
+    def _rebuild_unchosen(self, exclude_last: bool) -> list[str]:
+        return [song_id for song_id in self._playlist_info.song_ids
+                if song_id not in self._failed_to_load and not (exclude_last and song_id == self._last_chosen)]
+
     def _shuffle_song_id(self) -> str | None:
         '''Return a random valid song id from the playlist and record the choice, return None if no valid song'''
         assert self._playlist_info is not None, 'playlist info not loaded'
-        valid_ids = set(self._playlist_info.song_ids) - set(self._failed_to_load)
-        if not valid_ids:
-            return None
-        unchosen = valid_ids - self._recent_chosen
-        if not unchosen:
-            self._recent_chosen.clear()
-            unchosen = (valid_ids - {self._last_chosen}) or valid_ids
-
-        song_id = random.choice(list(unchosen))
-        self._last_chosen = song_id
-        self._recent_chosen.add(song_id)
-        return song_id
+        for _ in range(2):
+            if not self._unchosen:
+                # new cycle: everything valid except the immediately previous pick
+                self._unchosen = self._rebuild_unchosen(exclude_last=True) or self._rebuild_unchosen(exclude_last=False)
+            # swap-and-pop random selection, skipping ids that failed after the
+            # pool was built
+            while self._unchosen:
+                idx = random.randrange(len(self._unchosen))
+                song_id = self._unchosen[idx]
+                self._unchosen[idx] = self._unchosen[-1]
+                self._unchosen.pop()
+                if song_id in self._failed_to_load:
+                    continue
+                self._last_chosen = song_id
+                return song_id
+        return None
 
     def _purge_expired_failed(self):
-        for song_id, value in list(self._failed_to_load.items()):
-            if value + self._RETRY_TIMEOUT < time.time():
-                self._failed_to_load.pop(song_id)
+        # timestamps are inserted in monotonic order, so expired entries are
+        # always at the front: pop until the first fresh one
+        cutoff = time.monotonic() - self._RETRY_TIMEOUT
+        while self._failed_to_load:
+            song_id, timestamp = next(iter(self._failed_to_load.items()))
+            if timestamp >= cutoff:
+                break
+            del self._failed_to_load[song_id]
 
     def _load_next_later(self, sleep=600):
         async def __load_later():
@@ -660,7 +852,7 @@ class FallbackList:
                 self._lists._player.check_playlist_empty()
                 return
             except Exception as e:
-                self._failed_to_load[song_id] = time.time()
+                self._failed_to_load[song_id] = time.monotonic()
                 asyncio.create_task(self._lists.broadcast_playlist_info())
                 self._logger.warning(
                     f'歌曲预加载失败{self._api.key}-{song_id}: {self._playlist_info.title}',
@@ -676,17 +868,22 @@ class FallbackConfig(DataConfig):
 
     def validate(self, key: str, value: typing.Any):
         if key in ['playlists', 'disabled_urls']:
-            value = tuple(collections.OrderedDict.fromkeys(value))
+            value = tuple(dict.fromkeys(value))
         return value
 
 
 class FallbackLists:
+    BROADCAST_BATCH = 50
+    SEND_TIMEOUT = 5
+
     def __init__(self, player: Player):
         self._player = player
         self._logger = logging.getLogger('player.fallbacks')
         self._config = FallbackConfig.create_sub(player._config, 'fallback')
         self._playlists: collections.OrderedDict[str, FallbackList] = collections.OrderedDict()
-        self._recent_chosen: set[str] = set()
+        self._bilibili_playlists: list[FallbackList] = []
+        self._inflight_loads: dict[str, asyncio.Task[FallbackList]] = {}
+        self._recent_chosen: collections.OrderedDict[str, None] = collections.OrderedDict()
         self._last_chosen: str | None = None
         self._info_clients: set[aiohttp.web.WebSocketResponse] = set()
 
@@ -704,13 +901,18 @@ class FallbackLists:
             *[ws.close() for ws in self._info_clients]))
 
     async def ws_info_handler(self, request: aiohttp.web.Request):
-        ws = aiohttp.web.WebSocketResponse(heartbeat=10, receive_timeout=15)
+        ws = aiohttp.web.WebSocketResponse(compress=False, heartbeat=10, receive_timeout=15)
         await ws.prepare(request)
         try:
             self._info_clients.add(ws)
             await self.broadcast_playlist_info()
-            async for msg in ws:
-                pass
+            # push-only socket: just wait for the peer to go away instead of
+            # running the full message-iterator machinery per frame
+            while True:
+                msg = await ws.receive()
+                if msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSING,
+                                aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    break
         finally:
             self._info_clients.discard(ws)
         return ws
@@ -720,19 +922,52 @@ class FallbackLists:
         if not self._info_clients:
             return
 
-        await asyncio.gather(*[
-            ws.send_json({
-                url: {
-                    'info': dataclasses.asdict(playlist._playlist_info),
-                    'api': playlist._api.key,
-                    'failed_count': playlist.failed_count
-                }
-                for url, playlist in self._playlists.items() if playlist._playlist_info is not None
-            }) for ws in self._info_clients])
+        # build and serialize the snapshot once instead of per client
+        payload = _ws_dumps({
+            url: {
+                'info': playlist._playlist_info.to_dict(),
+                'api': playlist._api.key,
+                'failed_count': playlist.failed_count
+            }
+            for url, playlist in self._playlists.items() if playlist._playlist_info is not None
+        })
+
+        disconnected: set[aiohttp.web.WebSocketResponse] = set()
+
+        async def safe_send(ws: aiohttp.web.WebSocketResponse):
+            try:
+                await asyncio.wait_for(ws.send_str(payload), timeout=self.SEND_TIMEOUT)
+            except Exception:
+                disconnected.add(ws)
+
+        # fan out in batches, yielding between them so a large client set
+        # does not block the event loop for the whole broadcast
+        clients = list(self._info_clients)
+        for offset in range(0, len(clients), self.BROADCAST_BATCH):
+            await asyncio.gather(*[safe_send(ws) for ws in clients[offset:offset + self.BROADCAST_BATCH]])
+            await asyncio.sleep(0)
+        self._info_clients -= disconnected
 
     async def _load_list(self, url: str, refresh: bool = False):
+        # coalesce concurrent loads of the same url (UI double-clicks,
+        # auto-refresh) behind a single in-flight fetch
+        if inflight := self._inflight_loads.get(url):
+            return await inflight
+        task = asyncio.ensure_future(self._do_load_list(url, refresh))
+        self._inflight_loads[url] = task
+        try:
+            return await task
+        finally:
+            self._inflight_loads.pop(url, None)
+
+    async def _do_load_list(self, url: str, refresh: bool):
         playlist = await FallbackList.from_url(self, url, refresh=refresh)
+        if old := self._playlists.get(playlist.url):
+            if old in self._bilibili_playlists:
+                self._bilibili_playlists.remove(old)
         self._playlists[playlist.url] = playlist
+        if isinstance(playlist._api, BilibiliAPI):
+            self._bilibili_playlists.append(playlist)
         return playlist
 
     @property
@@ -740,32 +975,52 @@ class FallbackLists:
         return [playlist.cached_next for playlist in self._playlists.values() if playlist.cached_next]
 
     def check_bilibili_multipart(self, song_info: SongInfo):
-        """Check for update for all fallback playlists"""
-        if song_info.source != 'Bilibili':
+        """Check for update for all Bilibili fallback playlists"""
+        if song_info.source != 'Bilibili' or not self._bilibili_playlists:
             return
-        if not song_info.meta.get('part') or len(song_info.meta['part']) <= 1:
+        if len(song_info.meta.get('part') or ()) <= 1:
             return
-        bvid = song_info.id.split('_p')[0]
-        for playlist in self._playlists.values():
+        bvid = song_info.id.rsplit('_p', 1)[0]
+        for playlist in self._bilibili_playlists:
             playlist._check_bilibili_multipart(bvid, song_info)
 
     def get_random_song(self) -> SongInfo | None:
-        cached_songs = [(playlist, playlist.cached_next)
-                        for playlist in self._playlists.values() if playlist.cached_next and playlist.url not in self._config.disabled_urls]
-        if not cached_songs:
+        # single-pass Efraimidis-Spirakis (A-Res) weighted sampling: draw a key
+        # random() ** (1 / weight) per candidate and keep the max, which matches
+        # random.choices without materializing candidate and weight lists;
+        # a second max restricted to not-recently-chosen songs replaces the
+        # separate unplayed filter pass
+        chosen_key = unplayed_key = -1.0
+        chosen = unplayed = None
+        disabled_urls = self._config.disabled_urls
+        for playlist in self._playlists.values():
+            song = playlist.cached_next
+            if not song or playlist.url in disabled_urls:
+                continue
+            weight = playlist.songs_count - playlist.failed_count
+            if weight <= 0:
+                continue
+            key = random.random() ** (1.0 / weight)
+            if key > chosen_key:
+                chosen_key, chosen = key, (playlist, song)
+            if key > unplayed_key and song.composite_id not in self._recent_chosen:
+                unplayed_key, unplayed = key, (playlist, song)
+
+        if chosen is None:
             if [playlist for playlist in self._playlists.values() if not playlist.all_failed]:
                 self._logger.info('后备播放列表中没有加载好的歌曲')
             return None
 
-        unplayed = [(playlist, song) for playlist, song in cached_songs
-                    if song.composite_id not in self._recent_chosen]
-        if not unplayed:
-            self._recent_chosen.clear()
-            unplayed = cached_songs
-
-        weights = [playlist.songs_count - playlist.failed_count for playlist, _ in unplayed]
-        playlist, song = random.choices(unplayed, weights=weights, k=1)[0]
-        self._recent_chosen.add(song.composite_id)
+        if unplayed is None:
+            unplayed = chosen
+        playlist, song = unplayed
+        # bounded LRU instead of grow-then-clear: evicting the oldest entries
+        # keeps membership checks O(1) without the big-bang reset
+        self._recent_chosen[song.composite_id] = None
+        self._recent_chosen.move_to_end(song.composite_id)
+        capacity = max(sum(p.songs_count for p in self._playlists.values()) // 2, 1)
+        while len(self._recent_chosen) > capacity:
+            self._recent_chosen.popitem(last=False)
         asyncio.create_task(playlist.load_random_next())
 
         return song
@@ -779,6 +1034,8 @@ class FallbackLists:
 
     async def remove_playlist_url(self, url: str):
         if removed_list := self._playlists.pop(url, None):
+            if removed_list in self._bilibili_playlists:
+                self._bilibili_playlists.remove(removed_list)
             asyncio.create_task(removed_list.close())
         self._config.playlists = tuple(self._playlists)  # save changed playlists
         asyncio.create_task(self.broadcast_playlist_info())
@@ -833,14 +1090,13 @@ class MusicDownloader:
     def __init__(self, player: Player) -> None:
         self._player = player
         self._logger = logging.getLogger('player.downloader')
-        self._session = create_aiohttp_session(headers={
-            'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36 Edg/118.0.2088.61',
-        })
+        self._session = create_aiohttp_session(headers=UA_HEADERS)
         self._bilibili = BilibiliAPI(self._request, self._cookies_getter(BilibiliCookieLoader))
         self._qqmusic = QQMusicAPI(self._request, self._cookies_getter(QQMusicCookieLoader))
         self._netease = NeteaseMusicAPI(self._request, self._cookies_getter(NeteaseMusicCookieLoader))
         self._cache_worker_task = asyncio.create_task(self._remove_oversized_cache())
         self._cache_worker_pending = asyncio.Event()
+        self._basedir: str | None = None
 
     def _cookies_getter(self, loader_class: type[CookieLoader]) -> CookiesGetter:
         def _getter():
@@ -861,10 +1117,12 @@ class MusicDownloader:
 
     @property
     def basedir(self):
-        '''cache directory from config'''
+        '''cache directory from config, only created when config changes'''
         basedir = os.path.basename(self._player._config.cache_basedir)
-        os.makedirs(basedir, exist_ok=True)
-        return basedir
+        if basedir != self._basedir:
+            os.makedirs(basedir, exist_ok=True)
+            self._basedir = basedir
+        return self._basedir
 
     async def _get_decibel(self, filename: str) -> float | None:
         return await get_decibel(self._to_cache_path(filename))
@@ -875,6 +1133,13 @@ class MusicDownloader:
     def _is_valid_entry(self, entry: CacheEntry):
         return os.path.isfile(self._to_cache_path(entry.song_file))
 
+    async def _probe_size(self, entry: CacheEntry) -> int | None:
+        '''existence and size of the cached file in a single async stat, None if missing'''
+        try:
+            return (await aiofiles.os.stat(self._to_cache_path(entry.song_file))).st_size
+        except OSError:
+            return None
+
     async def _delete_entry_and_file(self, entry: CacheEntry):
         try:
             if self._is_valid_entry(entry):
@@ -891,29 +1156,44 @@ class MusicDownloader:
         return (await CacheEntry.get_total_size()) / (1024 ** 2)
 
     async def check_invalid_records(self):
-        async for entry in CacheEntry.all():
-            await entry.update_valid(self._is_valid_entry(entry))
+        # bounded fan-out instead of a strictly serial scan; update_valid
+        # only writes rows whose validity actually changed
+        entries = await CacheEntry.all()
+        semaphore = asyncio.Semaphore(32)
+
+        async def check(entry: CacheEntry):
+            async with semaphore:
+                await entry.update_valid(await self._probe_size(entry) is not None)
+
+        await asyncio.gather(*(check(entry) for entry in entries))
 
     async def _remove_oversized_cache(self):
         while True:
             await self._cache_worker_pending.wait()
             try:
+                # hoist protected basenames out of the loop: O(1) membership
+                # test per entry instead of rescanning both song lists
+                protected = {os.path.basename(song.filename)
+                             for song in self._player._playlist.all_song_info}
+                protected |= {os.path.basename(song.filename)
+                              for song in self._player._fallback.cached_song_list}
+
+                # query the total once and decrement locally per deletion
+                # instead of a DB aggregate roundtrip every iteration
+                _total_cache = await self.get_total_cache_size()
                 for entry in await CacheEntry.get_entries_by_access():
-                    _total_cache = await self.get_total_cache_size()
                     self._logger.debug(f'缓存大小: {_total_cache:.2f} MiB/{self._player._config.cache_limit_mb} MiB')
                     if _total_cache < self._player._config.cache_limit_mb:
                         break
 
-                    for song in self._player._playlist.all_song_info:
-                        if os.path.basename(song.filename) == os.path.basename(entry.song_file):
-                            return
-
-                    for song in self._player._fallback.cached_song_list:
-                        if os.path.basename(song.filename) == os.path.basename(entry.song_file):
-                            return
+                    if os.path.basename(entry.song_file) in protected:
+                        continue  # skip in-use entries instead of aborting the scan
 
                     self._logger.info(f'缓存大小达到限制，删除缓存文件: {entry.song_file}')
+                    was_valid = entry.is_valid
                     await self._delete_entry_and_file(entry)
+                    if was_valid:
+                        _total_cache -= entry.file_size / (1024 ** 2)
 
             except (asyncio.CancelledError, KeyboardInterrupt):
                 raise
@@ -929,9 +1209,8 @@ class MusicDownloader:
         if not self._player._config.cache_proxy:
             return aiohttp.web.json_response(data={'success': False, 'reason': 'no-proxy'})
         try:
-            headers = {'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36 Edg/118.0.2088.61'}
             async with aiohttp_socks.ProxyConnector.from_url(self._player._config.cache_proxy) as connector:
-                async with aiohttp.request('GET', 'https://www.bilibili.com/video/BV1GJ411x7h7/', headers=headers,
+                async with aiohttp.request('GET', 'https://www.bilibili.com/video/BV1GJ411x7h7/', headers=UA_HEADERS,
                                            connector=connector, timeout=aiohttp.ClientTimeout(total=5)) as rsp:
                     if 'Never Gonna Give You Up' in await rsp.text():
                         return aiohttp.web.json_response(data={'success': True, 'reason': ''})
@@ -950,7 +1229,7 @@ class MusicDownloader:
                     return await rsp.content.read()
                 raise ValueError(f'{rsp.status} {rsp.reason}')
         else:
-            headers = {**(headers or {}), 'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36 Edg/118.0.2088.61'}
+            headers = (headers | UA_HEADERS) if headers else UA_HEADERS
             async with aiohttp_socks.ProxyConnector.from_url(proxy) as connector:
                 async with aiohttp.request(method, url, params=params, data=data, headers=headers,
                                            cookies=cookies, connector=connector) as rsp:
@@ -980,9 +1259,10 @@ class MusicDownloader:
             return
         if check_keyword and (banned_keyword := self._player._check_keyword_banned(cache_entry.song_title)):
             raise KeywordBannedError(f'{banned_keyword} ({cache_entry.song_title})')
-        if not await cache_entry.update_valid(self._is_valid_entry(cache_entry)):
+        file_size = await self._probe_size(cache_entry)
+        if not await cache_entry.update_valid(file_size is not None):
             return
-        if not cache_entry.file_size == os.stat(self._to_cache_path(cache_entry.song_file)).st_size:
+        if cache_entry.file_size != file_size:
             self._logger.warning(f'缓存文件大小不匹配: {cache_entry.song_file}，可能文件已损坏')
             await self._delete_entry_and_file(cache_entry)
             return
@@ -1005,15 +1285,24 @@ class MusicDownloader:
         self._logger.info(f'正在从{api.key}下载歌曲: "{song_info.title}" ({song_id})')
         if query:
             query.dispatch_loading()
+
+        # use hash of song_id to avoid filename conflict due to case-insensitive filesystem;
+        # crc32 is enough for disambiguation, no need for a crypto digest
+        name_prefix = f'{api.key}-{song_id}-{zlib.crc32(song_id.encode()):08x}'
+        filename = f'{name_prefix}-{os.path.basename(urllib.parse.urlparse(song_info.url).path)}'
+        if filename.endswith('.m4s'):
+            filename = filename[:-len('.m4s')] + '.m4a'
+
+        # stream to disk instead of buffering the whole file in memory,
+        # letting aiohttp apply backpressure on the download
+        size = 0
         async with self._session.get(song_info.url, headers=song_info.headers) as r:
             if r.status != 200:
                 raise ValueError(f'Failed to download music file, status={r.status}')
-            content = await r.content.read()
-
-        # use hash of song_id to avoid filename conflict due to case-insensitive filesystem
-        name_prefix = f'{api.key}-{song_id}-{hashlib.md5(song_id.encode()).hexdigest()[:8]}'
-        filename = f'{name_prefix}-{os.path.basename(urllib.parse.urlparse(song_info.url).path)}'
-        filename = re.sub(r'\.m4s$', '.m4a', filename)
+            async with aiofiles.open(self._to_cache_path(filename), 'wb') as f:
+                async for chunk in r.content.iter_chunked(64 * 1024):
+                    size += len(chunk)
+                    await f.write(chunk)
 
         entry = await CacheEntry.save_cache_entry(
             api,
@@ -1024,13 +1313,10 @@ class MusicDownloader:
             song_singer=song_info.singer or '',
             song_decibel=None,
             song_duration=song_info.meta.pop('duration', None),
-            song_meta={**song_info.meta, 'size': len(content)},
-            file_size=len(content)
+            song_meta={**song_info.meta, 'size': size},
+            file_size=size
         )
 
-        async with aiofiles.open(self._to_cache_path(entry.song_file), 'wb') as f:
-            await f.write(content)
-
         await entry.update_decibel(await self._get_decibel(entry.song_file))
         self._logger.info(f'歌曲从{api.key}缓存完成: "{entry.song_title}" ({entry.song_id})')
         return entry.to_songinfo()
@@ -1080,25 +1366,33 @@ class MusicDownloader:
                     self._logger.debug(f'从{api.key}获取匹配ID的歌曲信息时失败: {str(e)[:100]}')
                     return None
 
-        pending = [self.get_from_query(api, query.keywords, query) for api in api_list]
+        pending = {asyncio.create_task(self.get_from_query(api, query.keywords, query), name=f'query-{api.key}')
+                   for api in api_list}
         errors = []
-        while pending:
-            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
-            for task in done:
-                try:
-                    songinfo_result = task.result()
-                    [task.cancel() for task in pending]
-                    return await self._player.add_song(query.user, songinfo_result, query)
-                except KeywordBannedError:
-                    raise
-                except Exception as e:
-                    errors.append(e)
-                    if isinstance(e, NoQueryMatchError):
-                        self._logger.debug(f'没有从{e}找到匹配结果: "{query}"')
-                    elif isinstance(e, NoPlayurlError):
-                        self._logger.debug(f'未从{e}找到"{query}"的播放链接')
-                    else:
-                        self._logger.exception('查找歌曲时出错')
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        songinfo_result = task.result()
+                        return await self._player.add_song(query.user, songinfo_result, query)
+                    except KeywordBannedError:
+                        raise
+                    except Exception as e:
+                        errors.append(e)
+                        if isinstance(e, NoQueryMatchError):
+                            self._logger.debug(f'没有从{e}找到匹配结果: "{query}"')
+                        elif isinstance(e, NoPlayurlError):
+                            self._logger.debug(f'未从{e}找到"{query}"的播放链接')
+                        else:
+                            self._logger.exception('查找歌曲时出错')
+        finally:
+            # drain losers so cancelled searches release their sockets and
+            # do not surface "exception was never retrieved" warnings
+            if pending:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
         query.dispatch_failed('no-resource')
         if all(isinstance(e, NoQueryMatchError) for e in errors):
             self._logger.info(f'"{query.user.summary}"的请求没有匹配结果: "{query}"')
@@ -1107,12 +1401,13 @@ class MusicDownloader:
 
     async def user_playlists_handler(self, request: aiohttp.web.Request):
         all_playlists = {}
-        for api in self.apis:
-            try:
-                if playlists := await api.user_playlists():
-                    all_playlists[api.key] = [dataclasses.asdict(data) for data in playlists]
-            except Exception:
-                self._logger.exception(f'从{api.key}获取用户播放列表时出错')
+        results = await asyncio.gather(*[api.user_playlists() for api in self.apis],
+                                       return_exceptions=True)
+        for api, result in zip(self.apis, results):
+            if isinstance(result, BaseException):
+                self._logger.error(f'从{api.key}获取用户播放列表时出错', exc_info=result)
+            elif result:
+                all_playlists[api.key] = [data.to_dict() for data in result]
         return aiohttp.web.json_response(status=200, data=all_playlists)
 
     async def serve_file_handler(self, request: aiohttp.web.Request):
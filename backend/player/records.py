@@ -1,27 +1,42 @@
 from __future__ import annotations
 import typing
+import bisect
 import collections
 import logging
 import asyncio
-import dataclasses
 import datetime
 
 import aiohttp.web
+import orjson
 
 from ..db import RecentBvidEntry, PlaylistEntry, QueryEntry
 
+_UTC = datetime.timezone.utc
+
 
 def _combine_tasks(tasks: typing.Iterable[asyncio.Task]):
-    async def _resolve():
-        for task in tasks:
-            await task
-    return asyncio.create_task(_resolve())
+    # gather lets independent saves overlap instead of resolving one by one
+    return asyncio.ensure_future(asyncio.gather(*tasks))
+
+
+_noop_future: asyncio.Future | None = None
+
+
+def _noop_task() -> asyncio.Future:
+    '''shared already-completed future for error-path returns, avoiding a Task
+    allocation and loop round trip per asyncio.create_task(asyncio.sleep(0))'''
+    global _noop_future
+    loop = asyncio.get_running_loop()
+    if _noop_future is None or _noop_future.get_loop() is not loop:
+        _noop_future = loop.create_future()
+        _noop_future.set_result(None)
+    return _noop_future
 
 
 class RecentBvid:
     def __init__(self, player: Player):
         self._player = player
-        self._recent_bvid: collections.deque[tuple[UserInfo, str]] = collections.deque()
+        self._recent_bvid: collections.deque[tuple[UserInfo, str]] = collections.deque(maxlen=self.num_limit)
         self._recent_bvid_meta: dict[str, SongMeta] = {}
         self._logger = logging.getLogger('player.recent_bvid')
         self._meta_task_lock = asyncio.Lock()
@@ -30,6 +45,12 @@ class RecentBvid:
     def num_limit(self) -> int:
         return self._player._config.recent_bvid_limit
 
+    def _check_limit(self):
+        '''rebuild the bounded deque only when the configured limit changed'''
+        if self._recent_bvid.maxlen != (limit := self.num_limit):
+            # slice from the left: newest entries sit at the front
+            self._recent_bvid = collections.deque(list(self._recent_bvid)[:limit], maxlen=limit)
+
     async def init(self):
         self._recent_bvid.extend(await RecentBvidEntry.get_recent_bvid(self.num_limit))
         asyncio.create_task(RecentBvidEntry.discard_old_bvid(self.num_limit))
@@ -37,57 +58,121 @@ class RecentBvid:
 
     async def _fetch_meta(self):
         async with self._meta_task_lock:
-            for bvid in {bvid for _, bvid in self._recent_bvid} - set(self._recent_bvid_meta):
-                try:
-                    self._recent_bvid_meta[bvid] = await self._player._downloader.get_single_meta(
-                        self._player._downloader._bilibili, bvid)
-                    self._player.dispatch_status()
-                except Exception:
-                    self._logger.exception(f'BV号元数据缓存失败：{bvid}')
+            # overlap the metadata fetches, bounded to stay polite to the API
+            semaphore = asyncio.Semaphore(5)
+
+            async def fetch(bvid: str):
+                async with semaphore:
+                    try:
+                        self._recent_bvid_meta[bvid] = await self._player._downloader.get_single_meta(
+                            self._player._downloader._bilibili, bvid)
+                        self._player.dispatch_status()
+                    except Exception:
+                        self._logger.exception(f'BV号元数据缓存失败：{bvid}')
+
+            missing = {bvid for _, bvid in self._recent_bvid} - set(self._recent_bvid_meta)
+            await asyncio.gather(*(fetch(bvid) for bvid in missing))
             for bvid in set(self._recent_bvid_meta) - {bvid for _, bvid in self._recent_bvid}:
                 self._recent_bvid_meta.pop(bvid, None)
 
     async def record_bvid(self, user: UserInfo, bvid: str):
+        self._check_limit()
         self._recent_bvid.appendleft((user, bvid))
-        while len(self._recent_bvid) > self.num_limit:
-            self._recent_bvid.pop()
         self._player.dispatch_status()
         await RecentBvidEntry.add_entry(bvid, user)
         await self._fetch_meta()
 
     def _get_meta_data(self, bvid: str) -> dict | None:
         if meta := self._recent_bvid_meta.get(bvid):
-            return dataclasses.asdict(meta)
+            return meta.to_dict()
 
     def as_list(self):
         return [
-            {'bvid': bvid, 'user': dataclasses.asdict(user), 'meta': self._get_meta_data(bvid)}
+            {'bvid': bvid, 'user': user.to_dict(), 'meta': self._get_meta_data(bvid)}
             for user, bvid in self._recent_bvid
         ]
 
 
 class PlayerPlaylist:
+    POS_COMMIT_DEBOUNCE = 0.05
+
     def __init__(self, player: Player):
         self._player = player
         self._playlist: list[PlaylistEntry] = []
+        # uid_hash -> queued entries by that user in insertion order, so cancel
+        # lookups don't rescan the whole playlist
+        self._user_entries: dict[str, list[PlaylistEntry]] = {}
+        # O(1) lookups by pk and by (song_id, song_source), kept in step with _playlist
+        self._by_id: dict[int, PlaylistEntry] = {}
+        self._by_song: dict[tuple[str, str], PlaylistEntry] = {}
+        # main/fallback split rebuilt lazily after mutations; status reads it several times
+        self._partition_cache: tuple[list[PlaylistEntry], list[PlaylistEntry]] | None = None
         self._logger = logging.getLogger('player.playlist')
         self._commit_pos_lock = asyncio.Lock()
+        # position writes queued for the next debounced bulk_update, latest per entry
+        self._pending_pos: dict[int, PlaylistEntry] = {}
+        # removed entries awaiting their batched state write, keyed by target state
+        self._pending_removals: dict[str, list[PlaylistEntry]] = {'played': [], 'canceled': []}
+        self._removal_lock = asyncio.Lock()
 
     async def init(self):
         self._playlist = await PlaylistEntry.get_queued_entries()
         self._playlist.sort(key=lambda x: x.queue_position)
-
-    async def _commit_pos(self, entries: list[PlaylistEntry]):
+        self._user_entries.clear()
+        self._by_id.clear()
+        self._by_song.clear()
+        for entry in self._playlist:
+            self._index_entry(entry)
+            self._by_id[entry.id] = entry
+            self._by_song[(entry.song_id, entry.song_source)] = entry
+        self._invalidate_partition()
+
+    def _index_entry(self, entry: PlaylistEntry):
+        uid_hash = entry.to_user().uid_hash
+        if uid_hash:
+            self._user_entries.setdefault(uid_hash, []).append(entry)
+
+    def _unindex_entry(self, entry: PlaylistEntry):
+        uid_hash = entry.to_user().uid_hash
+        if (entries := self._user_entries.get(uid_hash)) and entry in entries:
+            entries.remove(entry)
+            if not entries:
+                del self._user_entries[uid_hash]
+
+    def _commit_pos(self, entries: list[PlaylistEntry]) -> asyncio.Task[int | None]:
+        self._pending_pos.update({entry.id: entry for entry in entries})
+        return asyncio.create_task(self._flush_pos())
+
+    async def _flush_pos(self) -> int | None:
+        # debounce so consecutive moves (drag-reorder) collapse into one write;
+        # whichever task grabs the lock first drains the whole queue
+        await asyncio.sleep(self.POS_COMMIT_DEBOUNCE)
         async with self._commit_pos_lock:
-            return await PlaylistEntry.bulk_update(entries, fields=['queue_position'])
+            if not self._pending_pos:
+                return None
+            pending = list(self._pending_pos.values())
+            self._pending_pos.clear()
+            return await PlaylistEntry.bulk_update(pending, fields=['queue_position'])
+
+    def _invalidate_partition(self):
+        self._partition_cache = None
+
+    def _partition(self) -> tuple[list[PlaylistEntry], list[PlaylistEntry]]:
+        if self._partition_cache is None:
+            main: list[PlaylistEntry] = []
+            fallback: list[PlaylistEntry] = []
+            for entry in self._playlist:
+                (fallback if entry.is_fallback else main).append(entry)
+            self._partition_cache = (main, fallback)
+        return self._partition_cache
 
     @property
     def _main_queue(self) -> list[PlaylistEntry]:
-        return [entry for entry in self._playlist if not entry.is_fallback]
+        return self._partition()[0]
 
     @property
     def _fallback_queue(self) -> list[PlaylistEntry]:
-        return [entry for entry in self._playlist if entry.is_fallback]
+        return self._partition()[1]
 
     @property
     def current_entry(self) -> PlaylistEntry | None:
@@ -102,12 +187,22 @@ class PlayerPlaylist:
 
     @property
     def all_song_info(self) -> list[SongInfo]:
-        return [entry.to_songinfo() for entry in self._playlist]
+        return PlaylistEntry.to_songinfos(self._playlist)
 
     @property
     def pending_main_entries(self) -> list[PlaylistEntry]:
         return self._main_queue[1:]
 
+    def latest_pending_entry_of(self, user: UserInfo) -> PlaylistEntry | None:
+        """Latest cancellable main-queue entry by this user, via the per-user index"""
+        if not user.uid_hash or not (entries := self._user_entries.get(user.uid_hash)):
+            return None
+        main_head = next((e for e in self._playlist if not e.is_fallback), None)
+        for entry in reversed(entries):
+            if not entry.is_fallback and entry is not main_head:
+                return entry
+        return None
+
     @property
     def is_empty(self) -> bool:
         return not self._playlist
@@ -119,35 +214,46 @@ class PlayerPlaylist:
             'progress': entry.progress,
             'is_fallback': entry.is_fallback,
             'is_from_control': entry.is_from_control,
-            'user': dataclasses.asdict(entry.to_user()),
-            'music': dataclasses.asdict(entry.to_songinfo()),
+            'user': entry.to_user().to_dict(),
+            'music': entry.to_songinfo().to_dict(),
         }
 
     @property
     def status(self) -> dict:
+        # build each entry dict once and share it between the sections instead
+        # of serializing every entry twice for combined_list
+        current = self.current_entry
+        current_dict = None
+        main: list[dict] = []
+        fallback: list[dict] = []
+        combined: list[dict] = []
+        for entry in self._playlist:
+            entry_dict = self.as_dict_entry(entry)
+            combined.append(entry_dict)
+            (fallback if entry.is_fallback else main).append(entry_dict)
+            if entry is current:
+                current_dict = entry_dict
         return {
-            'current': self.as_dict_entry(self.current_entry) if self.current_entry else None,
-            'playlist': [self.as_dict_entry(entry) for entry in self._main_queue],
-            'fallback': [self.as_dict_entry(entry) for entry in self._fallback_queue],
-            'combined_list': [self.as_dict_entry(entry) for entry in self._playlist],
+            'current': current_dict,
+            'playlist': main,
+            'fallback': fallback,
+            'combined_list': combined,
         }
 
     def _on_list_update(self):
         if self._player._config.clear_playing_fallback:
-            if self.current_entry and self.current_entry.is_fallback:
-                self.current_entry.is_fallback = False
-                asyncio.create_task(self.current_entry.save(update_fields=['is_fallback']))
+            if (current := self.current_entry) and current.is_fallback:
+                current.is_fallback = False
+                self._invalidate_partition()
+                asyncio.create_task(current.save(update_fields=['is_fallback']))
 
         self._player.dispatch_status()
 
     def get_queued_entry(self, song_info: SongInfo) -> PlaylistEntry | None:
-        for entry in self._playlist:
-            if entry.song_id == song_info.id and entry.song_source == song_info.source:
-                return entry
-        return None
+        return self._by_song.get((song_info.id, song_info.source))
 
     def is_queued(self, song_info: SongInfo) -> bool:
-        return any(song_info.id == queued.id and song_info.source == queued.source for queued in self.all_song_info)
+        return (song_info.id, song_info.source) in self._by_song
 
     def add_song(self, user: UserInfo, song_info: SongInfo,
                  is_auto_entry: bool, is_from_control: bool, is_fallback: bool) -> asyncio.Task[PlaylistEntry]:
@@ -155,39 +261,52 @@ class PlayerPlaylist:
             user, song_info, position=self.get_next_position(),
             is_auto_entry=is_auto_entry, is_from_control=is_from_control, is_fallback=is_fallback)
         self._playlist.append(entry)
+        self._index_entry(entry)
+        self._by_song[(entry.song_id, entry.song_source)] = entry
+        self._invalidate_partition()
+
+        def _on_saved():
+            # pk id is only assigned by the save
+            self._by_id[entry.id] = entry
+            self._on_list_update()
+
         # dispatch after saved and got pk id
-        return asyncio.create_task(entry.new_entry_save(callback=self._on_list_update))
+        return asyncio.create_task(entry.new_entry_save(callback=_on_saved))
 
     def _find_entry(self, entry_id: int) -> PlaylistEntry | None:
-        for entry in self._playlist:
-            if entry.id == entry_id:
-                return entry
+        return self._by_id.get(entry_id)
 
     def _move_entry_pos(self, entry_id: int, new_pos: int) -> asyncio.Task[int | None]:
         """Move an entry to a new position in the playlist, pushing back entries beginning from `new_pos`"""
         if not (entry := self._find_entry(entry_id)):
             self._logger.warning(f'未找到要移动到位置{new_pos}的条目：ID {entry_id}')
-            return asyncio.create_task(asyncio.sleep(0))
+            return _noop_task()
+        # only `entry` changes its place in the order: shifting the tail keeps
+        # its relative order, so a bisected re-insert replaces the full re-sort
+        self._playlist.remove(entry)
         to_update = [e for e in self._playlist if e.queue_position >= new_pos]
         for i, _after_entry in enumerate(to_update, start=1):
             _after_entry.queue_position = new_pos + i
         entry.queue_position = new_pos
         to_update.append(entry)
-        self._playlist.sort(key=lambda x: x.queue_position)
+        bisect.insort(self._playlist, entry, key=lambda x: x.queue_position)
+        self._invalidate_partition()
         self._on_list_update()
-        return asyncio.ensure_future(self._commit_pos(to_update))
+        return self._commit_pos(to_update)
 
     def reorder_entries(self, ordered_entry_ids: list[int]) -> asyncio.Task[int]:
         self._logger.info(f'重新排序条目：{ordered_entry_ids}')
-        for new_pos, entry_id in enumerate(ordered_entry_ids, start=1):
-            if entry := self._find_entry(entry_id):
-                entry.queue_position = new_pos
-        for new_pos, entry in enumerate(self._playlist, start=(new_pos + 1)):
-            if entry.id not in ordered_entry_ids:
-                entry.queue_position = new_pos
-        self._playlist.sort(key=lambda x: x.queue_position)
+        # the target order is given, so rebuild the list directly instead of
+        # assigning positions and re-sorting; unlisted entries keep their
+        # relative order at the tail
+        ordered = [entry for entry_id in ordered_entry_ids if (entry := self._find_entry(entry_id))]
+        ordered_ids = set(ordered_entry_ids)
+        self._playlist = ordered + [entry for entry in self._playlist if entry.id not in ordered_ids]
+        for new_pos, entry in enumerate(self._playlist, start=1):
+            entry.queue_position = new_pos
+        self._invalidate_partition()
         self._on_list_update()
-        return asyncio.ensure_future(self._commit_pos(self._playlist))
+        return self._commit_pos(self._playlist)
 
     def move_to_end(self, entry_id: int) -> asyncio.Task[int | None]:
         self._logger.info(f'将条目{entry_id}移至末尾')
@@ -196,12 +315,12 @@ class PlayerPlaylist:
     def move_down(self, entry_id: int) -> asyncio.Task[int | None]:
         if not (entry := self._find_entry(entry_id)):
             self._logger.warning(f'未找到要后移的条目：ID {entry_id}')
-            return asyncio.create_task(asyncio.sleep(0))
+            return _noop_task()
         next_pos = next((e.queue_position for e in self._playlist
                          if e.queue_position > entry.queue_position and e.is_fallback == entry.is_fallback), None)
         if next_pos is None:
             self._logger.warning('没有后续待播，无法后移')
-            return asyncio.create_task(asyncio.sleep(0))
+            return _noop_task()
         return self._move_entry_pos(entry_id, next_pos + 1)
 
     def move_to_top(self, entry_id: int) -> asyncio.Task[int | None]:
@@ -215,7 +334,7 @@ class PlayerPlaylist:
                 return self._move_entry_pos(entry_id, min([entry.queue_position for entry in self._fallback_queue]))
             else:
                 return self._move_entry_pos(entry_id, self.current_entry.queue_position + 1)
-        return asyncio.create_task(asyncio.sleep(0))
+        return _noop_task()
 
     def remove_played_entry(self, entry_id: int) -> asyncio.Task[None]:
         return asyncio.create_task(self._remove_entry(entry_id, canceled=False))
@@ -226,22 +345,48 @@ class PlayerPlaylist:
     async def _remove_entry(self, entry_id: int, canceled: bool):
         if entry := self._find_entry(entry_id):
             self._playlist.remove(entry)
+            self._unindex_entry(entry)
+            self._by_id.pop(entry.id, None)
+            if self._by_song.get(key := (entry.song_id, entry.song_source)) is entry:
+                del self._by_song[key]
+            self._invalidate_partition()
             self._on_list_update()
-            if canceled:
-                await entry.set_canceled()
-            else:
-                await entry.set_played()
+            # mirror set_canceled/set_played in memory, then batch the writes so
+            # burst removals collapse into a few statements instead of one each
+            if not entry.is_auto_entry:
+                entry.is_queued = False
+                if canceled:
+                    entry.is_canceled = True
+            self._pending_removals['canceled' if canceled else 'played'].append(entry)
+            await self._flush_removals()
         else:
             self._logger.warning(f'未找到ID={entry_id}的条目从队列移除')
 
+    async def _flush_removals(self):
+        await asyncio.sleep(self.POS_COMMIT_DEBOUNCE)
+        async with self._removal_lock:
+            pending = self._pending_removals
+            if not (pending['played'] or pending['canceled']):
+                return
+            self._pending_removals = {'played': [], 'canceled': []}
+            if delete_ids := [e.id for bucket in pending.values() for e in bucket if e.is_auto_entry]:
+                await PlaylistEntry.filter(id__in=delete_ids).delete()
+            if canceled_ids := [e.id for e in pending['canceled'] if not e.is_auto_entry]:
+                await PlaylistEntry.filter(id__in=canceled_ids).update(is_queued=False, is_canceled=True)
+            if played_ids := [e.id for e in pending['played'] if not e.is_auto_entry]:
+                await PlaylistEntry.filter(id__in=played_ids).update(is_queued=False)
+
     def promote_from_fallback(self, entry_id: int, user: UserInfo) -> asyncio.Task[None]:
         tasks = []
 
         if entry := self._find_entry(entry_id):
             entry.is_fallback = False
+            self._invalidate_partition()
             if entry.to_user().privilege == 'owner' and entry.to_user().username == '':
+                self._unindex_entry(entry)
                 entry.set_user(user)
-                entry.created_at = datetime.datetime.now(datetime.timezone.utc)
+                self._index_entry(entry)
+                entry.created_at = datetime.datetime.now(_UTC)
             self._on_list_update()
             tasks.append(asyncio.create_task(entry.save()))
             if self.current_entry and entry.queue_position < self.current_entry.queue_position:
@@ -254,11 +399,26 @@ class PlayerPlaylist:
     def update_is_fallback(self, entry_id: int, is_fallback: bool) -> asyncio.Task[None]:
         if entry := self._find_entry(entry_id):
             entry.is_fallback = is_fallback
+            self._invalidate_partition()
             self._on_list_update()
             return asyncio.create_task(entry.save(update_fields=['is_fallback']))
         else:
             self._logger.warning(f'未找到ID={entry_id}的条目修改后备')
-            return asyncio.create_task(asyncio.sleep(0))
+            return _noop_task()
+
+
+async def _stream_history(request: aiohttp.web.Request, head: dict, rows: typing.Iterator[dict]):
+    '''stream `{**head, 'data': [*rows]}` row by row instead of materializing the page'''
+    resp = aiohttp.web.StreamResponse()
+    resp.content_type = 'application/json'
+    await resp.prepare(request)
+    await resp.write(orjson.dumps(head, option=orjson.OPT_NON_STR_KEYS)[:-1] + b',"data":[')
+    for i, row in enumerate(rows):
+        chunk = orjson.dumps(row, default=str, option=orjson.OPT_NON_STR_KEYS)
+        await resp.write(b',' + chunk if i else chunk)
+    await resp.write(b']}')
+    await resp.write_eof()
+    return resp
 
 
 async def handle_get_playlist_history(request: aiohttp.web.Request):
@@ -267,33 +427,34 @@ async def handle_get_playlist_history(request: aiohttp.web.Request):
         size=int(request.query['size']),
         hide_canceled=bool(request.query.get('hide_canceled', None)),
         filter=request.query.get('filter', ''))
-    return aiohttp.web.json_response(
-        status=200, data={
-            'total': total,
-            'filter': request.query.get('filter', ''),
-            'data': [{
-                'user': dataclasses.asdict(entry.to_user()),
-                'song': dataclasses.asdict(entry.to_songinfo()),
-                'progress': entry.progress,
-                'created_at': entry.created_at.timestamp(),
-                'canceled': entry.is_canceled,
-            } for entry in entries]})
+    return await _stream_history(
+        request,
+        {'total': total, 'filter': request.query.get('filter', '')},
+        ({
+            'user': entry.to_user().to_dict(),
+            'song': entry.to_songinfo().to_dict(),
+            'progress': entry.progress,
+            'created_at': entry.created_at.timestamp(),
+            'canceled': entry.is_canceled,
+        } for entry in entries))
 
 
 async def handle_get_query_history(request: aiohttp.web.Request):
     page_num = int(request.query['page_num'])
     size = int(request.query['size'])
-    return aiohttp.web.json_response(
-        status=200, data={
-            'total': await QueryEntry.get_history_count(),
-            'data': [{
-                'query_text': entry.query_text,
-                'user': dataclasses.asdict(entry.to_user()),
-                'song': dataclasses.asdict(entry.to_songinfo()),
-                'created_at': entry.created_at.timestamp(),
-                'result': entry.result,
-                'match_count': entry.match_count,
-            } for entry in await QueryEntry.get_history_entries(page_num, size)]})
+    total = await QueryEntry.get_history_count()
+    entries = await QueryEntry.get_history_entries(page_num, size)
+    return await _stream_history(
+        request,
+        {'total': total},
+        ({
+            'query_text': entry.query_text,
+            'user': entry.to_user().to_dict(),
+            'song': entry.to_songinfo().to_dict(),
+            'created_at': entry.created_at.timestamp(),
+            'result': entry.result,
+            'match_count': entry.match_count,
+        } for entry in entries))
 
 
 if typing.TYPE_CHECKING:
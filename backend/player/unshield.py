@@ -11,10 +11,12 @@ class UnsheildRuleConfig(DataConfig):
     def __post_init__(self):
         super().__post_init__()
         self._keyword_map: dict[str, str] | None = None
+        self._keyword_pattern: re.Pattern | None = None
 
     def validate(self, key: str, value):
         if key == 'keywords':
             self._keyword_map = None
+            self._keyword_pattern = None
             return tuple(w for w in value if w.count(',') == 1 and w[0] != ',')
         return value
 
@@ -24,13 +26,22 @@ class UnsheildRuleConfig(DataConfig):
             self._keyword_map = {k: v for k, v in (keyword.split(',', 1) for keyword in self.keywords) if k}
         return self._keyword_map
 
+    @property
+    def keyword_pattern(self) -> re.Pattern | None:
+        '''compiled alternation of the map keys, None when there are no keywords'''
+        if self._keyword_pattern is None and self.keyword_map:
+            self._keyword_pattern = re.compile('|'.join(re.escape(k) for k in self.keyword_map))
+        return self._keyword_pattern
+
 
 SPACER_CHARS = '\U000e0020\u0592'
+SPACER_RE = re.compile(f'[{SPACER_CHARS}]+')
 
 
 def unshield(text: str, rules: UnsheildRuleConfig) -> str:
-    text = re.sub(rf'[{SPACER_CHARS}]+', '', text)
+    text = SPACER_RE.sub('', text)
 
-    for match in re.finditer(rf'({"|".join(rules.keyword_map)})', text):
-        text = text.replace(match.group(0), rules.keyword_map.get(match.group(0), match.group(0)))
+    if pattern := rules.keyword_pattern:
+        keyword_map = rules.keyword_map
+        text = pattern.sub(lambda match: keyword_map[match.group(0)], text)
     return text
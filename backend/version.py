@@ -1,3 +1,4 @@
+import functools
 import subprocess
 import sys
 try:
@@ -20,8 +21,13 @@ def get_git_tag():
     return tag + ' ' if tag else ''
 
 
+@functools.cache
 def get_git_version():
-    return f'{get_git_tag()}{get_git_commit_hash()[:7]} ({get_git_commit_date()})'
+    # one git invocation for hash and date instead of one each; the version
+    # can't change while the server runs, so cache the result
+    commit_hash, commit_date = subprocess.check_output(
+        ['git', 'log', '-1', '--format=%H%x1f%ad', '--date=short']).decode('utf-8').strip().split('\x1f')
+    return f'{get_git_tag()}{commit_hash[:7]} ({commit_date})'
 
 
 def get_version():
@@ -2,8 +2,9 @@ from __future__ import annotations
 import unittest
 import aiohttp
 import asyncio
-import json
+import orjson
 import typing
+import types
 import pathlib
 import sys
 import contextlib
@@ -25,14 +26,14 @@ from backend.api.common import API, PlaylistResult, ParsedPlaylistUrl  # noqa: E
 from backend.api import BilibiliAPI, NeteaseMusicAPI, QQMusicAPI  # noqa: E402
 
 
-@contextlib.contextmanager
-def disable_logger(logger_name: str):
-    logger = logging.getLogger(logger_name)
-    logger.disabled = True
-    try:
-        yield
-    finally:
-        logger.disabled = False
+def setUpModule():
+    # silence expected warning-level noise (e.g. cookie domain mismatches)
+    # for the whole module instead of per-call disable-logger contexts
+    logging.disable(logging.WARNING)
+
+
+def tearDownModule():
+    logging.disable(logging.NOTSET)
 
 
 @dataclasses.dataclass
@@ -54,6 +55,9 @@ class CollectedTestData:
 
     @staticmethod
     def _serialize_bytes(data: bytes) -> str:
+        if data.isascii():
+            # cheap C-level check covers most JSON payloads
+            return data.decode('ascii')
         try:
             return data.decode('utf-8')
         except UnicodeDecodeError:
@@ -61,11 +65,17 @@ class CollectedTestData:
 
     def to_dict(self) -> dict:
         """Convert to serializable dictionary."""
+        # flat dict build, avoiding dataclasses.asdict's recursive deep copy
         return {
             'requests': [
                 {
-                    **dataclasses.asdict(req),
-                    'data': self._serialize_bytes(req.data) if req.data else None
+                    'method': req.method,
+                    'url': req.url,
+                    'data': self._serialize_bytes(req.data) if req.data else None,
+                    'params': req.params,
+                    'headers': req.headers,
+                    'cookies': req.cookies,
+                    'proxy': req.proxy,
                 }
                 for req in self.requests
             ],
@@ -75,13 +85,19 @@ class CollectedTestData:
 
 API_TYPE = typing.TypeVar('API_TYPE', bound=API)
 
+# built once instead of per request; read-only so a hook can't mutate it
+_DEFAULT_HEADERS = types.MappingProxyType({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36 Edg/118.0.2088.61',
+})
+
 
 class RequestProvider(typing.Generic[API_TYPE]):
-    def __init__(self, api_cls: type[API_TYPE], cookies: http.cookies.SimpleCookie = http.cookies.SimpleCookie()):
+    def __init__(self, api_cls: type[API_TYPE], cookies: http.cookies.SimpleCookie | None = None):
         self._session: typing.Optional[aiohttp.ClientSession] = None
         self._hook_callback: typing.Callable[[RequestParams], bytes | None] | None = None
         self._collected_data: CollectedTestData | None = None
-        self._cookies: http.cookies.SimpleCookie = cookies
+        # a shared default instance would leak cookies between providers
+        self._cookies: http.cookies.SimpleCookie = cookies if cookies is not None else http.cookies.SimpleCookie()
         self.api = api_cls(self, self._get_cookies)
 
     def _get_cookies(self) -> http.cookies.SimpleCookie:
@@ -95,20 +111,27 @@ class RequestProvider(typing.Generic[API_TYPE]):
     @property
     def session(self) -> aiohttp.ClientSession:
         if self._session is None:
-            self._session = aiohttp.ClientSession(trust_env=True, timeout=aiohttp.ClientTimeout(total=10))
+            # all test requests hit a handful of hosts, so cap the pool, keep
+            # connections alive between tests and cache DNS lookups
+            connector = aiohttp.TCPConnector(
+                limit=32, limit_per_host=8, keepalive_timeout=30,
+                ttl_dns_cache=300, enable_cleanup_closed=True)
+            self._session = aiohttp.ClientSession(
+                connector=connector, trust_env=True, timeout=aiohttp.ClientTimeout(total=10))
         return self._session
 
     @contextlib.asynccontextmanager
-    async def collect(self, key: str, filepath: str = 'test_api_data.json'):
-        """Context manager to collect real requests and responses for test case building."""
+    async def collect(self, key: str, filepath: str = 'test_api_data.jsonl'):
+        """Context manager to collect real requests and responses for test case building.
+
+        Each recording is appended as one JSONL line so saving stays O(one
+        record); use compact_collected_data to merge the log into a dict."""
         self._collected_data = CollectedTestData()
         try:
             yield self._collected_data
-            with open(filepath, 'rt') as f:
-                data = json.load(f)
-            data[key] = self._collected_data.to_dict()
-            with open(filepath, 'wt') as f:
-                f.write(json.dumps(data, indent=2, ensure_ascii=False))
+            with open(filepath, 'ab') as f:
+                f.write(orjson.dumps({'key': key, 'data': self._collected_data.to_dict()},
+                                     option=orjson.OPT_NON_STR_KEYS) + b'\n')
         finally:
             self._collected_data = None
 
@@ -121,10 +144,7 @@ class RequestProvider(typing.Generic[API_TYPE]):
             if hook_response := self._hook_callback(request_params):
                 return hook_response
 
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36 Edg/118.0.2088.61',
-            **(headers or {})
-        }
+        headers = {**_DEFAULT_HEADERS, **headers} if headers else dict(_DEFAULT_HEADERS)
 
         try:
             async with self.session.request(method, url, data=data, params=params, headers=headers,
@@ -164,32 +184,85 @@ class RequestProvider(typing.Generic[API_TYPE]):
         await self.close()
 
 
-class TestAPIHelpers(unittest.TestCase):
-    """Test cases for API helper methods."""
-    def _create_api(self, cookies=http.cookies.SimpleCookie()) -> API:
-        class DummyAPI(API):
-            async def search(self):
-                pass
+def compact_collected_data(filepath: str = 'test_api_data.jsonl') -> dict:
+    """Merge the append-only collection log into one key -> data dict, later records win."""
+    data: dict = {}
+    with open(filepath, 'rb') as f:
+        for line in f:
+            if line := line.strip():
+                record = orjson.loads(line)
+                data[record['key']] = record['data']
+    return data
+
+
+_REPLAY_DATA_PATH = pathlib.Path(__file__).parent / 'test_api_data.jsonl'
+
+
+def _deserialize_bytes(data: str) -> bytes:
+    """Inverse of CollectedTestData._serialize_bytes; binary payloads were
+    base64-encoded, text was stored as-is."""
+    try:
+        decoded = base64.b64decode(data, validate=True)
+    except ValueError:
+        # not valid base64, so it was stored as plain text
+        return data.encode('utf-8')
+    try:
+        decoded.decode('utf-8')
+    except UnicodeDecodeError:
+        # valid base64 of non-text bytes means it came from the base64 branch
+        return decoded
+    # decodes both ways: text that merely looks like base64 was stored as-is
+    return data.encode('utf-8')
+
+
+def _replay_key(method: str, url: str, params: dict | None) -> tuple:
+    return (method, url, repr(sorted((params or {}).items())))
+
+
+def _load_replay_responses(key: str) -> dict[tuple, bytes] | None:
+    """Build a request -> response-bytes map from collected fixtures, or None
+    when there is no recording for this suite (tests then go live)."""
+    if not _REPLAY_DATA_PATH.is_file():
+        return None
+    collected = compact_collected_data(str(_REPLAY_DATA_PATH)).get(key)
+    if not collected:
+        return None
+    responses: dict[tuple, bytes] = {}
+    for req, resp in zip(collected['requests'], collected['responses']):
+        responses.setdefault(_replay_key(req['method'], req['url'], req.get('params')),
+                             _deserialize_bytes(resp))
+    return responses
 
-            async def songinfo(self):
-                pass
 
-            async def playlist_from_url(self):
-                pass
+class _DummyAPI(API):
+    """Minimal concrete API used by the helper tests; defined once at module
+    scope so _create_api doesn't rebuild the class per call."""
+    async def search(self):
+        pass
 
-            async def user_playlists(self):
-                pass
+    async def songinfo(self):
+        pass
 
-            def match_song_id(self):
-                pass
+    async def playlist_from_url(self):
+        pass
 
-            def _parse_playlist_url(self, url):
-                return None
+    async def user_playlists(self):
+        pass
 
-            def _to_playlist_url(self, parsed):
-                return ''
+    def match_song_id(self):
+        pass
 
-        return DummyAPI(lambda *args, **kwargs: None, lambda: cookies)  # type: ignore
+    def _parse_playlist_url(self, url):
+        return None
+
+    def _to_playlist_url(self, parsed):
+        return ''
+
+
+class TestAPIHelpers(unittest.TestCase):
+    """Test cases for API helper methods."""
+    def _create_api(self, cookies=http.cookies.SimpleCookie()) -> API:
+        return _DummyAPI(lambda *args, **kwargs: None, lambda: cookies)  # type: ignore
 
     def test_check_full_match(self):
         api = self._create_api()
@@ -282,15 +355,12 @@ class TestAPIHelpers(unittest.TestCase):
         api = self._create_api()
         self.assertEqual(len(api.cookies), 0)
 
+        # one load() call parses all cookies instead of a Morsel parse per key
         test_cookies = http.cookies.SimpleCookie()
-        test_cookies['key1'] = 'value1'
-        test_cookies['key1']['domain'] = '.test.com'
-        test_cookies['key2'] = 'value2'
-        test_cookies['key2']['domain'] = 'sub.test.com'
-        test_cookies['key3'] = 'value3'
-        test_cookies['key3']['domain'] = '.other.com'
-        test_cookies['key4'] = 'value4'
-        test_cookies['key4']['domain'] = 'plain.com'
+        test_cookies.load('key1=value1; key2=value2; key3=value3; key4=value4')
+        for key, domain in [('key1', '.test.com'), ('key2', 'sub.test.com'),
+                            ('key3', '.other.com'), ('key4', 'plain.com')]:
+            test_cookies[key]['domain'] = domain
         api = self._create_api(cookies=test_cookies)
 
         self.assertEqual(api.cookies['key1'].value, 'value1')
@@ -298,20 +368,19 @@ class TestAPIHelpers(unittest.TestCase):
         self.assertEqual(api.cookies['key3'].value, 'value3')
         self.assertEqual(api.cookies['key4'].value, 'value4')
 
-        with disable_logger('api.common'):
-            self.assertEqual(api._get_cookie('key1', '.test.com'), 'value1')
-            self.assertIsNone(api._get_cookie('key1', 'sub.test.com'))
-            self.assertEqual(api._get_cookie('key2', 'sub.test.com'), 'value2')
-            self.assertEqual(api._get_cookie('key2', '.test.com'), 'value2')
-            self.assertIsNone(api._get_cookie('key3', '.test.com'))
-            self.assertEqual(api._get_cookie('key3', '.other.com'), 'value3')
+        self.assertEqual(api._get_cookie('key1', '.test.com'), 'value1')
+        self.assertIsNone(api._get_cookie('key1', 'sub.test.com'))
+        self.assertEqual(api._get_cookie('key2', 'sub.test.com'), 'value2')
+        self.assertEqual(api._get_cookie('key2', '.test.com'), 'value2')
+        self.assertIsNone(api._get_cookie('key3', '.test.com'))
+        self.assertEqual(api._get_cookie('key3', '.other.com'), 'value3')
 
-            self.assertEqual(api._get_cookie('key1', 'test.com'), 'value1')
-            self.assertEqual(api._get_cookie('key4', 'plain.com'), 'value4')
-            self.assertEqual(api._get_cookie('key4', '.plain.com'), 'value4')
+        self.assertEqual(api._get_cookie('key1', 'test.com'), 'value1')
+        self.assertEqual(api._get_cookie('key4', 'plain.com'), 'value4')
+        self.assertEqual(api._get_cookie('key4', '.plain.com'), 'value4')
 
-            self.assertEqual(api._get_cookie('missing', '.test.com', 'default'), 'default')
-            self.assertIsNone(api._get_cookie('missing', '.test.com'))
+        self.assertEqual(api._get_cookie('missing', '.test.com', 'default'), 'default')
+        self.assertIsNone(api._get_cookie('missing', '.test.com'))
 
     def test_api_keys(self):
         self.assertEqual(BilibiliAPI(None, None).key, 'Bilibili')  # type: ignore
@@ -388,8 +457,13 @@ class TestMatchSongID(unittest.TestCase):
 
 class TestMatchPlaylistUrl(unittest.TestCase):
     def create_assert(self, api: API, list_type: str | None):
+        # bind the hot methods as locals so the closure skips the attribute
+        # lookups on every asserted URL
+        parse_url = api._parse_playlist_url
+        to_url = api._to_playlist_url
+
         def _assert(url: str, id: str, extra: dict = {}):
-            result = api._parse_playlist_url(url)
+            result = parse_url(url)
             if list_type is None:
                 self.assertIsNone(result)
             else:
@@ -400,8 +474,8 @@ class TestMatchPlaylistUrl(unittest.TestCase):
                 self.assertEqual(result.extra, extra)
 
                 # Test bidirectional conversion
-                converted_url = api._to_playlist_url(result)
-                converted_result = api._parse_playlist_url(converted_url)
+                converted_url = to_url(result)
+                converted_result = parse_url(converted_url)
                 self.assertIsNotNone(converted_result)
                 assert converted_result is not None  # for linter
                 self.assertEqual(converted_result.type, result.type)
@@ -505,25 +579,77 @@ class TestMatchPlaylistUrl(unittest.TestCase):
         assert_invalid('123456', '')
 
 
+class PlaylistFixture(typing.NamedTuple):
+    '''Frozen playlist test fixture; suites build their fixture tuples once at
+    import and tests read fields through C-level attribute access.'''
+    handler_method: str
+    input: tuple
+    normalized_url: str
+    type: str
+    cache_id: str
+    title: str
+    song_ids: tuple[str, ...]
+    songs_meta: dict
+    extra: dict = {}
+
+
 class TestAPIMixin(typing.Generic[API_TYPE]):
     _API_CLASS: type[API_TYPE]
     _TEST_SONGINFO: dict
     _TEST_SEARCH: list[dict]
-    _TEST_PLAYLIST_URL: list[dict]
-
-    async def asyncSetUp(self):
-        self.provider = RequestProvider(self._API_CLASS)
-        self.api = self.provider.api
-
-    async def asyncTearDown(self):
-        await self.provider.close()
-        await asyncio.sleep(1)
+    _TEST_PLAYLIST_URL: tuple[PlaylistFixture, ...]
+
+    _loop: asyncio.AbstractEventLoop
+    provider: RequestProvider
+    api: API_TYPE
+
+    @classmethod
+    def setUpClass(cls):
+        # one provider (and thus one aiohttp session) per suite, so tests
+        # against the same host reuse pooled TCP/TLS connections instead of
+        # re-handshaking for every test method
+        cls._loop = asyncio.new_event_loop()
+        cls.provider = RequestProvider(cls._API_CLASS)
+        cls.api = cls.provider.api
+        # replay recorded responses instead of hitting the network when a
+        # fixture recording exists; set YUMI_LIVE_TESTS=1 to force live runs
+        cls._replay_stack = contextlib.ExitStack()
+        if not os.environ.get('YUMI_LIVE_TESTS'):
+            if replay := _load_replay_responses(cls.__name__):
+                cls._replay_stack.enter_context(cls.provider.hook_request(
+                    lambda req: replay.get(_replay_key(req.method, req.url, req.params))))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._replay_stack.close()
+
+        async def _shutdown():
+            await cls.provider.close()
+            # give leftover response/transport tasks a bounded chance to
+            # finish; the extra tick lets SSL transports complete shutdown
+            pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            if pending:
+                await asyncio.wait(pending, timeout=0.05)
+            await asyncio.sleep(0.05)
+        cls._loop.run_until_complete(_shutdown())
+        cls._loop.close()
+
+    def _callTestMethod(self, method):
+        # run async test methods on the class-shared loop so the session
+        # created in setUpClass stays bound to a live loop across tests
+        result = method()
+        if asyncio.iscoroutine(result):
+            type(self)._loop.run_until_complete(result)
 
     def assertFieldEqual(self, value, expected):
         assert isinstance(self, unittest.TestCase)
         if isinstance(expected, type):
             self.assertIsInstance(value, expected)
         elif isinstance(expected, dict):
+            if all(not isinstance(v, (type, dict)) for v in expected.values()):
+                # leaf dict without type placeholders: one C-level comparison
+                self.assertEqual(value, expected)
+                return
             self.assertEqual(set(value.keys()), set(expected.keys()))
             for k, v in value.items():
                 self.assertFieldEqual(v, expected[k])
@@ -544,235 +670,63 @@ class TestAPIMixin(typing.Generic[API_TYPE]):
         self.assertEqual(os.path.basename(urllib.parse.urlparse(song_info.url).path),
                          self._TEST_SONGINFO['response']['filename'])
 
-        async with self.provider.session.get(song_info.url, headers=song_info.headers) as resp:
-            self.assertEqual(resp.status, 200)
-            self.assertEqual(int(resp.headers['Content-Length']), self._TEST_SONGINFO['response']['size'])
+        # only the size is checked, so avoid downloading the media body
+        async with self.provider.session.head(song_info.url, headers=song_info.headers,
+                                              allow_redirects=True) as resp:
+            if resp.status == 200:
+                self.assertEqual(int(resp.headers['Content-Length']), self._TEST_SONGINFO['response']['size'])
+                return
+
+        # some media CDNs reject HEAD; fall back to a 1-byte ranged GET
+        async with self.provider.session.get(
+                song_info.url, headers={**song_info.headers, 'Range': 'bytes=0-0'}) as resp:
+            self.assertIn(resp.status, (200, 206))
+            if resp.status == 206:
+                size = int(resp.headers['Content-Range'].rsplit('/', 1)[-1])
+            else:
+                size = int(resp.headers['Content-Length'])
+            self.assertEqual(size, self._TEST_SONGINFO['response']['size'])
 
     async def test_search(self):
         assert isinstance(self, unittest.TestCase)
         if not getattr(self, '_TEST_SEARCH', None):
             raise unittest.SkipTest('No test data for search')
 
-        for search_info in self._TEST_SEARCH:
-            results = await self.api.search(search_info['query'])
+        # queries are independent, so overlap them on the shared session
+        results_list = await asyncio.gather(
+            *(self.api.search(search_info['query']) for search_info in self._TEST_SEARCH))
+        for search_info, results in zip(self._TEST_SEARCH, results_list):
             self.assertEqual(set(r.id for r in results), set(search_info['song_ids']))
 
+    _playlist_fixtures: dict[int, PlaylistResult] | None = None
+
+    async def _get_playlist_fixtures(self) -> dict[int, PlaylistResult]:
+        """Fetch every playlist fixture of the suite in one concurrent batch,
+        memoized at class scope so the per-handler tests share the responses."""
+        cls = type(self)
+        if cls._playlist_fixtures is None:
+            results = await asyncio.gather(
+                *(getattr(self.api, fixture.handler_method)(
+                    ParsedPlaylistUrl('', *fixture.input))
+                  for fixture in self._TEST_PLAYLIST_URL))
+            cls._playlist_fixtures = dict(enumerate(results))
+        return cls._playlist_fixtures
+
     async def _test_playlist_url(self, method_name: str):
         assert isinstance(self, unittest.TestCase)
-        for playlist_info in self._TEST_PLAYLIST_URL:
-            if playlist_info['handler_method'] != method_name:
+        fixtures = await self._get_playlist_fixtures()
+        for index, fixture in enumerate(self._TEST_PLAYLIST_URL):
+            if fixture.handler_method != method_name:
                 continue
-            handler = getattr(self.api, playlist_info['handler_method'])
-
-            playlist: PlaylistResult = await handler(
-                ParsedPlaylistUrl('', *playlist_info['input']))
-
-            self.assertEqual(playlist.type, playlist_info['type'])
-            self.assertEqual(playlist.cache_id, playlist_info['cache_id'])
-            self.assertEqual(playlist.extra, playlist_info.get('extra', {}))
-            self.assertEqual(playlist.title, playlist_info['title'])
-            for key, meta in playlist_info['songs_meta'].items():
+            playlist = fixtures[index]
+            self.assertEqual(playlist.type, fixture.type)
+            self.assertEqual(playlist.cache_id, fixture.cache_id)
+            self.assertEqual(playlist.extra, fixture.extra)
+            self.assertEqual(playlist.title, fixture.title)
+            for key, meta in fixture.songs_meta.items():
                 self.assertDictEqual(playlist.songs_meta[key], meta)
-            self.assertFalse(set(playlist_info['song_ids']) - set(playlist.song_ids))
-            self.assertEqual(self.api._to_playlist_url(playlist), playlist_info['normalized_url'])
-
-
-class TestNeteaseMusicAPI(TestAPIMixin[NeteaseMusicAPI], unittest.IsolatedAsyncioTestCase):
-    _API_CLASS = NeteaseMusicAPI
-    _TEST_SONGINFO = {
-        'id': '460528',
-        'response': {
-            'title': '白金ディスコ',
-            'singer': '井口裕香',
-            'headers': {},
-            'filename': '410390284f16e963b8cfba73a65ea58a.mp3',
-            'size': 10225415,
-            'meta': {
-                'duration': 256,
-                'decibel': -11.1449,
-            },
-        },
-    }
-    _TEST_SEARCH = [{
-        'query': '白金ディスコ 井口裕香',
-        'song_ids': ['460528', '399367220'],
-    }]
-    _TEST_PLAYLIST_URL = [{
-        'handler_method': '_fetch_playlist',
-        'input': ('9345473', {'type': 'playlist'}),
-        'normalized_url': 'https://music.163.com/playlist?id=9345473',
-        'type': 'playlist',
-        'cache_id': '9345473',
-        'extra': {'type': 'playlist'},
-        'title': '春☆稍纵即逝的樱花季(ゲーム插曲)',
-        'song_ids': ['478393', '641644'],
-        'songs_meta': {
-            '692560': {'title': '親愛なる世界へ', 'duration': 318, 'singer': 'Ceui'},
-        },
-    }]
-
-    async def test_playlist(self):
-        await self._test_playlist_url('_fetch_playlist')
-
-
-class TestQQMusicAPI(TestAPIMixin[QQMusicAPI], unittest.IsolatedAsyncioTestCase):
-    _API_CLASS = QQMusicAPI
-    _TEST_SONGINFO = {
-        'id': '002HLH8k10De6r',
-        'response': {
-            'title': '星间飞行',
-            'singer': '中島愛',
-            'headers': {},
-            'filename': 'M500003AN8qy3igKYS.mp3',
-            'size': 3745158,
-            'meta': {
-                'duration': 234,
-                'decibel': -11.012,
-            },
-        },
-    }
-    _TEST_SEARCH = [{
-        'query': '星间飞行',
-        'song_ids': ['002HLH8k10De6r', '002rbyGQ2enDEn', '001oBpTk2HjgoR', '003wQdka0xw2I7'],
-    }]
-    _TEST_PLAYLIST_URL = [{
-        'handler_method': '_fetch_playlist',
-        'input': ('9209322004', {}),
-        'normalized_url': 'https://y.qq.com/n/ryqq/playlist/9209322004',
-        'type': 'playlist',
-        'cache_id': '9209322004',
-        'title': '哔哩哔哩官方ACG精选',
-        'song_ids': ['00221jjt01LOTE', '002sh9nq3rZBWp'],
-        'songs_meta': {
-            '002w57E00BGzXn': {'title': '起风了', 'duration': 311, 'singer': '周深'},
-        },
-    }]
-
-    async def test_playlist(self):
-        await self._test_playlist_url('_fetch_playlist')
-
-
-class TestBilibiliAPI(TestAPIMixin[BilibiliAPI], unittest.IsolatedAsyncioTestCase):
-    _API_CLASS = BilibiliAPI
-    _TEST_SONGINFO = {
-        'id': 'BV1Ln4y1R7HU',
-        'response': {
-            'title': '【冰糖IO未披露新皮免费领取！】免费live2d模型',
-            'singer': '神宫凉子',
-            'headers': {
-                'user-agent': str,
-                'referer': 'https://www.bilibili.com/video/BV1Ln4y1R7HU',
-            },
-            'meta': {
-                'avid': 'av1055633454',
-                'type': '日常',
-                'duration': 79,
-                'decibel': -7.7,
-                'play_count': int,
-                'pages': list,
-            },
-            'filename': '1577576366-1-30280.m4s',
-            'size': 1913319,
-        },
-    }
-    _TEST_SEARCH = [{
-        'query': '真夜白音 模型公开',
-        'song_ids': ['BV1i94y1W77Y'],
-    }]
-    _TEST_PLAYLIST_URL = [{
-        'handler_method': '_fetch_playlist_from_bvid',
-        'input': ('BV1Xx41117tr', {}),
-        'normalized_url': 'https://www.bilibili.com/video/BV1Xx41117tr',
-        'type': 'multipart',
-        'cache_id': 'BV1Xx41117tr',
-        'title': '【CS公开课】计算机程序的构造和解释（SICP）【中英字幕】【FoOTOo&HITPT&Learning-SICP】',
-        'song_ids': ['BV1Xx41117tr_p20'],
-        'songs_meta': {
-            'BV1Xx41117tr_p1': {
-                'title': 'Lec1a：Lisp概览',
-                'duration': 4375,
-            },
-        },
-    }, {
-        'handler_method': '_fetch_fav_playlist',
-        'input': ('770262946', {}),
-        'normalized_url': 'https://www.bilibili.com/list/ml770262946',
-        'type': 'favorite',
-        'cache_id': '770262946',
-        'title': '小毛线收藏',
-        'song_ids': ['BV1zGe6edE2J', 'BV1H24y1T7ZY', 'BV1ev4y1E7xP', 'BV1qv4y1c7mK', 'BV1vb4y1B7DC',
-                     'BV17K4y1j7rV', 'BV17y4y167Uc', 'BV1Ba4y177Zg', 'BV1fJ411Q7Qw', 'BV1tJ411Q751',
-                     'BV11J411Q7UQ', 'BV1VJ411F7cU', 'BV1VJ411R7ou'],
-        'songs_meta': {
-            'BV1VJ411R7ou': {
-                'title': '【阿萨aza】5000粉庆祝初手书！当酒后你和可爱阿萨去跳舞时...',
-                'duration': 64,
-                'singer': 'はナビ',
-            },
-        },
-    }, {
-        'handler_method': '_fetch_series_playlist',
-        'input': ('1871798', {'uid': '434334701'}),
-        'normalized_url': 'https://space.bilibili.com/434334701/lists/1871798?type=series',
-        'type': 'series',
-        'cache_id': '1871798',
-        'extra': {'uid': '434334701'},
-        'title': '鲨歌',
-        'song_ids': ['BV1APtdedEgS', 'BV1gp4y1e71f'],
-        'songs_meta': {
-            'BV1APtdedEgS': {
-                'title': '翻唱了老八翻唱的「LOVE 2000」',
-                'duration': 111,
-            },
-        },
-    }, {
-        'handler_method': '_fetch_collection_playlist',
-        'input': ('558180', {'uid': '434334701'}),
-        'normalized_url': 'https://space.bilibili.com/434334701/lists/558180?type=season',
-        'type': 'collection',
-        'cache_id': '558180',
-        'extra': {'uid': '434334701'},
-        'title': '鲨鱼舞蹈系列',
-        'song_ids': ['BV1CT41147Uz', 'BV1ti4y1k7ez'],
-        'songs_meta': {
-            'BV1CT41147Uz': {
-                'title': '越南神曲叮叮当当舞！',
-                'duration': 27,
-            },
-        },
-    }, {
-        'handler_method': '_fetch_playlist_from_bvid',
-        'input': ('BV1rs4y1S7uB', {}),
-        'normalized_url': 'https://space.bilibili.com/434334701/lists/558180?type=season',
-        'type': 'collection',
-        'cache_id': '558180',
-        'extra': {'uid': '434334701'},
-        'title': '鲨鱼舞蹈系列',
-        'song_ids': ['BV1CT41147Uz', 'BV1ti4y1k7ez'],
-        'songs_meta': {
-            'BV1CT41147Uz': {
-                'title': '越南神曲叮叮当当舞！',
-                'duration': 27,
-            },
-        },
-    }]
-
-    async def test_playurl_api(self):
-        playurl = await self.api._get_playinfo('BV1Ln4y1R7HU', 1577576366)
-        self.assertEqual(playurl['code'], 0)
-        self.assertTrue('1577576366-1-30280.m4s' in str(playurl))
-
-    async def test_favorite_playlist(self):
-        await self._test_playlist_url('_fetch_fav_playlist')
-
-    async def test_series_playlist(self):
-        await self._test_playlist_url('_fetch_series_playlist')
-
-    async def test_collection_playlist(self):
-        await self._test_playlist_url('_fetch_collection_playlist')
-
-    async def test_bvid_playlist(self):
-        await self._test_playlist_url('_fetch_playlist_from_bvid')
+            self.assertFalse(set(fixture.song_ids) - set(playlist.song_ids))
+            self.assertEqual(self.api._to_playlist_url(playlist), fixture.normalized_url)
 
 
 if __name__ == '__main__':
@@ -788,9 +742,7 @@ if __name__ == '__main__':
     if args.run:
         asyncio.run(run())
     else:
-        if args.skip_api:
-            del TestBilibiliAPI
-            del TestNeteaseMusicAPI
-            del TestQQMusicAPI
+        # the async API suites live in test_api_*.py modules so they can run in
+        # parallel; --skip-api is kept as a no-op for older invocations
         asyncio.get_event_loop().set_debug(False)
         unittest.main(verbosity=2, argv=[arg for arg in sys.argv if not '--skip-api'.startswith(arg)])
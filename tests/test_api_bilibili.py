@@ -0,0 +1,136 @@
+from __future__ import annotations
+import unittest
+import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).parent))
+
+import test_api  # noqa: E402
+from backend.api import BilibiliAPI  # noqa: E402
+
+
+class TestBilibiliAPI(test_api.TestAPIMixin[BilibiliAPI], unittest.TestCase):
+    _API_CLASS = BilibiliAPI
+    _TEST_SONGINFO = {
+        'id': 'BV1Ln4y1R7HU',
+        'response': {
+            'title': '【冰糖IO未披露新皮免费领取！】免费live2d模型',
+            'singer': '神宫凉子',
+            'headers': {
+                'user-agent': str,
+                'referer': 'https://www.bilibili.com/video/BV1Ln4y1R7HU',
+            },
+            'meta': {
+                'avid': 'av1055633454',
+                'type': '日常',
+                'duration': 79,
+                'decibel': -7.7,
+                'play_count': int,
+                'pages': list,
+            },
+            'filename': '1577576366-1-30280.m4s',
+            'size': 1913319,
+        },
+    }
+    _TEST_SEARCH = [{
+        'query': '真夜白音 模型公开',
+        'song_ids': ['BV1i94y1W77Y'],
+    }]
+    _TEST_PLAYLIST_URL = (test_api.PlaylistFixture(
+        handler_method='_fetch_playlist_from_bvid',
+        input=('BV1Xx41117tr', {}),
+        normalized_url='https://www.bilibili.com/video/BV1Xx41117tr',
+        type='multipart',
+        cache_id='BV1Xx41117tr',
+        title='【CS公开课】计算机程序的构造和解释（SICP）【中英字幕】【FoOTOo&HITPT&Learning-SICP】',
+        song_ids=('BV1Xx41117tr_p20',),
+        songs_meta={
+            'BV1Xx41117tr_p1': {
+                'title': 'Lec1a：Lisp概览',
+                'duration': 4375,
+            },
+        },
+    ), test_api.PlaylistFixture(
+        handler_method='_fetch_fav_playlist',
+        input=('770262946', {}),
+        normalized_url='https://www.bilibili.com/list/ml770262946',
+        type='favorite',
+        cache_id='770262946',
+        title='小毛线收藏',
+        song_ids=('BV1zGe6edE2J', 'BV1H24y1T7ZY', 'BV1ev4y1E7xP', 'BV1qv4y1c7mK', 'BV1vb4y1B7DC',
+                  'BV17K4y1j7rV', 'BV17y4y167Uc', 'BV1Ba4y177Zg', 'BV1fJ411Q7Qw', 'BV1tJ411Q751',
+                  'BV11J411Q7UQ', 'BV1VJ411F7cU', 'BV1VJ411R7ou'),
+        songs_meta={
+            'BV1VJ411R7ou': {
+                'title': '【阿萨aza】5000粉庆祝初手书！当酒后你和可爱阿萨去跳舞时...',
+                'duration': 64,
+                'singer': 'はナビ',
+            },
+        },
+    ), test_api.PlaylistFixture(
+        handler_method='_fetch_series_playlist',
+        input=('1871798', {'uid': '434334701'}),
+        normalized_url='https://space.bilibili.com/434334701/lists/1871798?type=series',
+        type='series',
+        cache_id='1871798',
+        extra={'uid': '434334701'},
+        title='鲨歌',
+        song_ids=('BV1APtdedEgS', 'BV1gp4y1e71f'),
+        songs_meta={
+            'BV1APtdedEgS': {
+                'title': '翻唱了老八翻唱的「LOVE 2000」',
+                'duration': 111,
+            },
+        },
+    ), test_api.PlaylistFixture(
+        handler_method='_fetch_collection_playlist',
+        input=('558180', {'uid': '434334701'}),
+        normalized_url='https://space.bilibili.com/434334701/lists/558180?type=season',
+        type='collection',
+        cache_id='558180',
+        extra={'uid': '434334701'},
+        title='鲨鱼舞蹈系列',
+        song_ids=('BV1CT41147Uz', 'BV1ti4y1k7ez'),
+        songs_meta={
+            'BV1CT41147Uz': {
+                'title': '越南神曲叮叮当当舞！',
+                'duration': 27,
+            },
+        },
+    ), test_api.PlaylistFixture(
+        handler_method='_fetch_playlist_from_bvid',
+        input=('BV1rs4y1S7uB', {}),
+        normalized_url='https://space.bilibili.com/434334701/lists/558180?type=season',
+        type='collection',
+        cache_id='558180',
+        extra={'uid': '434334701'},
+        title='鲨鱼舞蹈系列',
+        song_ids=('BV1CT41147Uz', 'BV1ti4y1k7ez'),
+        songs_meta={
+            'BV1CT41147Uz': {
+                'title': '越南神曲叮叮当当舞！',
+                'duration': 27,
+            },
+        },
+    ))
+
+    async def test_playurl_api(self):
+        playurl = await self.api._get_playinfo('BV1Ln4y1R7HU', 1577576366)
+        self.assertEqual(playurl['code'], 0)
+        self.assertTrue('1577576366-1-30280.m4s' in str(playurl))
+
+    async def test_favorite_playlist(self):
+        await self._test_playlist_url('_fetch_fav_playlist')
+
+    async def test_series_playlist(self):
+        await self._test_playlist_url('_fetch_series_playlist')
+
+    async def test_collection_playlist(self):
+        await self._test_playlist_url('_fetch_collection_playlist')
+
+    async def test_bvid_playlist(self):
+        await self._test_playlist_url('_fetch_playlist_from_bvid')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
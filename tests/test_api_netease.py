@@ -0,0 +1,51 @@
+from __future__ import annotations
+import unittest
+import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).parent))
+
+import test_api  # noqa: E402
+from backend.api import NeteaseMusicAPI  # noqa: E402
+
+
+class TestNeteaseMusicAPI(test_api.TestAPIMixin[NeteaseMusicAPI], unittest.TestCase):
+    _API_CLASS = NeteaseMusicAPI
+    _TEST_SONGINFO = {
+        'id': '460528',
+        'response': {
+            'title': '白金ディスコ',
+            'singer': '井口裕香',
+            'headers': {},
+            'filename': '410390284f16e963b8cfba73a65ea58a.mp3',
+            'size': 10225415,
+            'meta': {
+                'duration': 256,
+                'decibel': -11.1449,
+            },
+        },
+    }
+    _TEST_SEARCH = [{
+        'query': '白金ディスコ 井口裕香',
+        'song_ids': ['460528', '399367220'],
+    }]
+    _TEST_PLAYLIST_URL = (test_api.PlaylistFixture(
+        handler_method='_fetch_playlist',
+        input=('9345473', {'type': 'playlist'}),
+        normalized_url='https://music.163.com/playlist?id=9345473',
+        type='playlist',
+        cache_id='9345473',
+        extra={'type': 'playlist'},
+        title='春☆稍纵即逝的樱花季(ゲーム插曲)',
+        song_ids=('478393', '641644'),
+        songs_meta={
+            '692560': {'title': '親愛なる世界へ', 'duration': 318, 'singer': 'Ceui'},
+        },
+    ),)
+
+    async def test_playlist(self):
+        await self._test_playlist_url('_fetch_playlist')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
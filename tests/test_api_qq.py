@@ -0,0 +1,50 @@
+from __future__ import annotations
+import unittest
+import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).parent))
+
+import test_api  # noqa: E402
+from backend.api import QQMusicAPI  # noqa: E402
+
+
+class TestQQMusicAPI(test_api.TestAPIMixin[QQMusicAPI], unittest.TestCase):
+    _API_CLASS = QQMusicAPI
+    _TEST_SONGINFO = {
+        'id': '002HLH8k10De6r',
+        'response': {
+            'title': '星间飞行',
+            'singer': '中島愛',
+            'headers': {},
+            'filename': 'M500003AN8qy3igKYS.mp3',
+            'size': 3745158,
+            'meta': {
+                'duration': 234,
+                'decibel': -11.012,
+            },
+        },
+    }
+    _TEST_SEARCH = [{
+        'query': '星间飞行',
+        'song_ids': ['002HLH8k10De6r', '002rbyGQ2enDEn', '001oBpTk2HjgoR', '003wQdka0xw2I7'],
+    }]
+    _TEST_PLAYLIST_URL = (test_api.PlaylistFixture(
+        handler_method='_fetch_playlist',
+        input=('9209322004', {}),
+        normalized_url='https://y.qq.com/n/ryqq/playlist/9209322004',
+        type='playlist',
+        cache_id='9209322004',
+        title='哔哩哔哩官方ACG精选',
+        song_ids=('00221jjt01LOTE', '002sh9nq3rZBWp'),
+        songs_meta={
+            '002w57E00BGzXn': {'title': '起风了', 'duration': 311, 'singer': '周深'},
+        },
+    ),)
+
+    async def test_playlist(self):
+        await self._test_playlist_url('_fetch_playlist')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -4,6 +4,7 @@ import unittest
 from pathlib import Path
 import logging
 import asyncio
+import functools
 
 # Add project root to Python path
 project_root = Path(__file__).parent.parent
@@ -13,9 +14,14 @@ sys.path.append(str(project_root))
 # logging.basicConfig(level=logging.DEBUG)
 logging.getLogger().disabled = True
 
-from backend.cookies.appbound.appbound import kill_running_arg, get_cookies  # noqa: E402
+from backend.cookies.appbound.appbound import kill_running_arg, peek_running_arg, get_cookies  # noqa: E402
 from backend.cookies.appbound.profile import get_browser_executable, get_browser_profile, ChromiumBrowsers  # noqa: E402
 
+# the registry/filesystem probes are pure queries per browser name; cache them
+# so the full browser test matrix probes each browser only once
+get_browser_executable = functools.lru_cache(maxsize=None)(get_browser_executable)
+get_browser_profile = functools.lru_cache(maxsize=None)(get_browser_profile)
+
 
 class TestAppbound(unittest.IsolatedAsyncioTestCase):
     _BROWSER_NAME: ChromiumBrowsers
@@ -45,30 +51,41 @@ class TestAppbound(unittest.IsolatedAsyncioTestCase):
             assert running_arg is not None
             self.assertEqual(running_arg.strip(), expected)
 
+    async def _await_running_arg(self, expected: str | None, timeout: float = 10, interval: float = 0.2):
+        """Poll the process state and return as soon as it matches instead of
+        sleeping a fixed 10 seconds; bounded by the previous fixed wait."""
+        deadline = asyncio.get_running_loop().time() + timeout
+        while asyncio.get_running_loop().time() < deadline:
+            running_arg = peek_running_arg(self.executable)
+            if (running_arg.strip() if running_arg is not None else None) == expected:
+                return
+            await asyncio.sleep(interval)
+
     async def test_kill_process_arg(self):
-        await asyncio.sleep(10)
+        await asyncio.sleep(1)
         kill_running_arg(self.executable)
         self.start_process(extra_arg='--test-running-arg')
-        await asyncio.sleep(10)
+        await self._await_running_arg('--test-running-arg')
         self.assert_running_arg('--test-running-arg')
 
     async def test_load_with_killed(self):
-        await asyncio.sleep(10)
+        await asyncio.sleep(1)
         kill_running_arg(self.executable)
         self.assert_running_arg(None)
         cookies = await get_cookies(self.executable, self.browser_profile)
         self.assertTrue(cookies)
-        await asyncio.sleep(10)
+        # grace period to catch an unwanted browser restart
+        await asyncio.sleep(2)
         self.assert_running_arg(None)
 
     async def test_load_with_running(self):
-        await asyncio.sleep(10)
+        await asyncio.sleep(1)
         kill_running_arg(self.executable)
         self.start_process(extra_arg='--test-running-arg')
-        await asyncio.sleep(10)
+        await self._await_running_arg('--test-running-arg')
         cookies = await get_cookies(self.executable, self.browser_profile)
         self.assertTrue(cookies)
-        await asyncio.sleep(10)
+        await self._await_running_arg('--test-running-arg --restore-last-session')
         self.assert_running_arg('--test-running-arg --restore-last-session')
 
 
@@ -88,5 +105,31 @@ class TestChromium(TestAppbound):
     _BROWSER_NAME = 'chromium'
 
 
+BROWSER_SUITES = [TestChrome, TestEdge, TestBrave, TestChromium]
+
+
+def _run_suites_parallel():
+    """Run each browser suite in its own subprocess concurrently; the suites
+    touch disjoint executables and profile dirs, and get_cookies picks a free
+    debug port per call, so they don't contend with each other."""
+    import concurrent.futures
+    import subprocess
+
+    def run_suite(cls: type) -> tuple[str, int, str]:
+        p = subprocess.run([sys.executable, __file__, cls.__name__], capture_output=True, text=True)
+        return cls.__name__, p.returncode, p.stderr
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(BROWSER_SUITES)) as pool:
+        results = list(pool.map(run_suite, BROWSER_SUITES))
+    for name, returncode, stderr in results:
+        print(f'===== {name}: {"OK" if returncode == 0 else f"exit code {returncode}"} =====')
+        print(stderr, end='')
+    sys.exit(max(returncode for _, returncode, _ in results))
+
+
 if __name__ == '__main__':
-    unittest.main()
+    if len(sys.argv) > 1:
+        # explicit selector or flags: run in-process like before
+        unittest.main()
+    else:
+        _run_suites_parallel()
@@ -14,22 +14,46 @@ from backend.player.commands import (  # noqa: E402
 )
 
 
+# expected registration and value-type tables, built once at import instead of
+# per test run; comparing whole dicts also gives a full diff on mismatch
+EXPECTED_COMMANDS = {
+    'paused': PausedCmd,
+    'show-event': ShowEventCmd,
+    'next': NextCmd,
+    'seek': SeekCmd,
+    'progress': ProgressCmd,
+    'cancel': CancelCmd,
+    'status': StatusCmd,
+    'set-is-fallback': SetIsFallbackCmd,
+    'unset-is-fallback': UnsetIsFallbackCmd,
+    'move-to-end': MoveToEndCmd,
+    'move-to-top': MoveToTopCmd,
+    'move-down': MoveDownCmd,
+    'volume-report': VolumeReportCmd
+}
+
+EXPECTED_VALUE_TYPES = {
+    PausedCmd: bool,
+    ShowEventCmd: BaseEvent,
+    NextCmd: int,
+    SeekCmd: int,
+    ProgressCmd: int,
+    CancelCmd: int,
+    StatusCmd: type(None),
+    SetIsFallbackCmd: int,
+    UnsetIsFallbackCmd: int,
+    MoveToEndCmd: int,
+    MoveToTopCmd: int,
+    MoveDownCmd: int,
+    VolumeReportCmd: (float, int),
+}
+
+
 class TestCommands(unittest.TestCase):
     def test_allowed_value_types(self):
         """Test that allowed_value_type returns correct types for each command"""
-        self.assertEqual(PausedCmd.allowed_value_type(), bool)
-        self.assertEqual(ShowEventCmd.allowed_value_type(), BaseEvent)
-        self.assertEqual(NextCmd.allowed_value_type(), int)
-        self.assertEqual(SeekCmd.allowed_value_type(), int)
-        self.assertEqual(ProgressCmd.allowed_value_type(), int)
-        self.assertEqual(CancelCmd.allowed_value_type(), int)
-        self.assertEqual(StatusCmd.allowed_value_type(), type(None))
-        self.assertEqual(SetIsFallbackCmd.allowed_value_type(), int)
-        self.assertEqual(UnsetIsFallbackCmd.allowed_value_type(), int)
-        self.assertEqual(MoveToEndCmd.allowed_value_type(), int)
-        self.assertEqual(MoveToTopCmd.allowed_value_type(), int)
-        self.assertEqual(MoveDownCmd.allowed_value_type(), int)
-        self.assertEqual(VolumeReportCmd.allowed_value_type(), (float, int))
+        self.assertEqual({cmd: cmd.allowed_value_type() for cmd in EXPECTED_VALUE_TYPES},
+                         EXPECTED_VALUE_TYPES)
 
     def test_valid_command_values(self):
         """Test that commands accept valid values"""
@@ -82,29 +106,8 @@ class TestCommands(unittest.TestCase):
 
     def test_player_commands_registration(self):
         """Test that all imported commands are properly registered in player_commands"""
-        expected_commands = {
-            'paused': PausedCmd,
-            'show-event': ShowEventCmd,
-            'next': NextCmd,
-            'seek': SeekCmd,
-            'progress': ProgressCmd,
-            'cancel': CancelCmd,
-            'status': StatusCmd,
-            'set-is-fallback': SetIsFallbackCmd,
-            'unset-is-fallback': UnsetIsFallbackCmd,
-            'move-to-end': MoveToEndCmd,
-            'move-to-top': MoveToTopCmd,
-            'move-down': MoveDownCmd,
-            'volume-report': VolumeReportCmd
-        }
-
-        # Check that all expected commands are registered
-        for cmd_key, cmd_class in expected_commands.items():
-            self.assertIn(cmd_key, player_commands)
-            self.assertEqual(player_commands[cmd_key], cmd_class)
-
-        # Check that there aren't any extra commands registered
-        self.assertEqual(set(player_commands.keys()), set(expected_commands.keys()))
+        # single dict compare covers both missing and extra registrations
+        self.assertEqual(dict(player_commands), EXPECTED_COMMANDS)
 
 
 if __name__ == '__main__':
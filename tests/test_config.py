@@ -1,4 +1,7 @@
 import unittest
+import unittest.mock
+import errno
+import io
 import json
 import tempfile
 import os
@@ -18,6 +21,40 @@ logging.getLogger().disabled = True
 from backend.config import DataConfig  # noqa: E402
 
 
+class MemoryConfigBackend:
+    """In-memory stand-in for config files so the small per-test configs skip
+    open/write/unlink syscalls; patched over open/os.replace in backend.config."""
+
+    def __init__(self):
+        self.files: dict[str, str] = {}
+
+    def open(self, path, mode='rt', encoding=None):
+        if 'w' in mode:
+            backend = self
+
+            class _Writer(io.StringIO):
+                def close(self):
+                    backend.files[path] = self.getvalue()
+                    super().close()
+
+            return _Writer()
+        try:
+            return io.StringIO(self.files[path])
+        except KeyError:
+            raise FileNotFoundError(errno.ENOENT, 'No such file or directory', path)
+
+    def replace(self, src, dst):
+        self.files[dst] = self.files.pop(src)
+
+    def patch(self, test_case: unittest.TestCase):
+        for patcher in (
+            unittest.mock.patch('backend.config.open', self.open, create=True),
+            unittest.mock.patch('backend.config.os.replace', self.replace),
+        ):
+            patcher.start()
+            test_case.addCleanup(patcher.stop)
+
+
 @dataclasses.dataclass
 class TestConfig(DataConfig):
     name: str = "default"
@@ -51,22 +88,18 @@ class UnionTestConfig(DataConfig):
 
 class TestDataConfig(unittest.TestCase):
     def setUp(self):
-        self.temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
-        json.dump({
+        self.backend = MemoryConfigBackend()
+        self.config_path = 'config.json'
+        self.backend.files[self.config_path] = json.dumps({
             "name": "test",
             "count": 42,
             "enabled": True,
             "value": 3.14
-        }, self.temp_file)
-        self.config_path = self.temp_file.name
-        self.temp_file.close()
-
-    def tearDown(self):
-        os.unlink(self.config_path)
+        })
+        self.backend.patch(self)
 
     def load_json(self):
-        with open(self.config_path, 'r') as f:
-            return json.load(f)
+        return json.loads(self.backend.files[self.config_path])
 
     def test_root_config_loading(self):
         root_config = TestConfig.create_root(self.config_path)
@@ -92,11 +125,10 @@ class TestDataConfig(unittest.TestCase):
 
     def test_list_handling(self):
         # Test with initial list data
-        with open(self.config_path, 'w') as f:
-            json.dump({
-                "name": "test",
-                "items": ["item1", "item2", "item3"]
-            }, f)
+        self.backend.files[self.config_path] = json.dumps({
+            "name": "test",
+            "items": ["item1", "item2", "item3"]
+        })
 
         root_config = TestConfig.create_root(self.config_path)
         root_config.load_config()
@@ -123,8 +155,9 @@ class TestDataConfig(unittest.TestCase):
 
 class TestSubConfig(unittest.TestCase):
     def setUp(self):
-        self.temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
-        json.dump({
+        self.backend = MemoryConfigBackend()
+        self.config_path = 'config.json'
+        self.backend.files[self.config_path] = json.dumps({
             "name": "test",
             "count": 42,
             "enabled": True,
@@ -135,16 +168,11 @@ class TestSubConfig(unittest.TestCase):
                 "name": "sub",
                 "scale": 1.0
             }
-        }, self.temp_file)
-        self.config_path = self.temp_file.name
-        self.temp_file.close()
-
-    def tearDown(self):
-        os.unlink(self.config_path)
+        })
+        self.backend.patch(self)
 
     def verify_json(self):
-        with open(self.config_path, 'r') as f:
-            return json.load(f)
+        return json.loads(self.backend.files[self.config_path])
 
     def test_sub_config_creation(self):
         root_config = TestConfig.create_root(self.config_path)
@@ -170,6 +198,21 @@ class TestSubConfig(unittest.TestCase):
         self.assertEqual(saved_data["sub"]["scale"], 2.0)
 
 
+# field specs that DataConfig must reject; shared by the invalid-definition
+# tests so each case is probed once per test via subTest
+INVALID_FIELD_CASES = [
+    ('list_field', list, dataclasses.field(default_factory=list)),
+    ('union_list', typing.Union[str, list], 'default'),
+    ('optional_dict', typing.Optional[dict], None),
+]
+
+
+def make_invalid_config(name, annotation, default):
+    '''Build a dataclass-decorated DataConfig subclass with a single field;
+    instantiating it runs the field-type validation'''
+    return dataclasses.make_dataclass('InvalidConfig', [(name, annotation, default)], bases=(DataConfig,))
+
+
 class TestDataConfigErrors(unittest.TestCase):
     def setUp(self):
         self.temp_dir = tempfile.mkdtemp()
@@ -359,23 +402,17 @@ class TestDataConfigErrors(unittest.TestCase):
 
     def test_invalid_type_definitions(self):
         # Test with invalid type hints
-        with self.assertRaises(ValueError):
-            @dataclasses.dataclass
-            class InvalidConfig(DataConfig):
-                invalid_list: list = dataclasses.field(default_factory=list)
-                invalid_union: typing.Union[str, list] = "default"
-                invalid_optional: typing.Optional[dict] = None
-            InvalidConfig()
+        for name, annotation, default in INVALID_FIELD_CASES:
+            with self.subTest(name=name), self.assertRaises(ValueError):
+                make_invalid_config(name, annotation, default)()
 
 
 class TestAdvancedTypeConfig(unittest.TestCase):
     def setUp(self):
-        self.temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
-        self.config_path = self.temp_file.name
-        self.temp_file.close()
-
-    def tearDown(self):
-        os.unlink(self.config_path)
+        self.backend = MemoryConfigBackend()
+        self.config_path = 'config.json'
+        self.backend.files[self.config_path] = ''
+        self.backend.patch(self)
 
     def test_union_types(self):
         # Initialize with default values
@@ -454,22 +491,11 @@ class TestAdvancedTypeConfig(unittest.TestCase):
         self.assertEqual(new_config.optional_num, 42)
 
     def test_invalid_union_types(self):
-        # Test that invalid union type definitions are caught
-        with self.assertRaises(ValueError):
-            @dataclasses.dataclass
-            class InvalidUnionConfig(DataConfig):
-                # Union with invalid type (list)
-                invalid_union: typing.Union[str, list] = "default"
-
-            InvalidUnionConfig()
-
-        with self.assertRaises(ValueError):
-            @dataclasses.dataclass
-            class InvalidOptionalConfig(DataConfig):
-                # Optional with invalid type (dict)
-                invalid_optional: typing.Optional[dict] = None
-
-            InvalidOptionalConfig()
+        # Test that invalid union type definitions are caught; the non-union
+        # list case is covered by test_invalid_type_definitions
+        for name, annotation, default in INVALID_FIELD_CASES[1:]:
+            with self.subTest(name=name), self.assertRaises(ValueError):
+                make_invalid_config(name, annotation, default)()
 
 
 if __name__ == '__main__':